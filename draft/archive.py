@@ -0,0 +1,61 @@
+import os
+import json
+import zlib
+import sqlite3
+import threading
+
+class GameweekArchive:
+
+    # Kept apart from the snapshots so a snapshot reset never throws away a season of history
+    path = os.getenv('ARCHIVE_DB', os.path.join(os.getenv('CACHE_DIR', os.path.join(os.path.dirname(__file__), "cache")), "archive.db"))
+
+    def __init__(self, path=None):
+        if path is not None:
+            self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # Reads and writes run in worker threads, the lock keeps them off the connection at the same time
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS live (event INTEGER PRIMARY KEY, body BLOB)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS picks (entry INTEGER, event INTEGER, body BLOB, PRIMARY KEY (entry, event))")
+        self.db.commit()
+
+    def encode(self, payload):
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    def decode(self, body):
+        return json.loads(zlib.decompress(body))
+
+    # Finished gameweeks never change, so the first copy saved is the one kept. The exception is the gameweek
+    # that has only just finished, confirmed bonus can still land after it flips, so that one may be replaced
+
+    def save_live(self, event, payload, replace=False):
+        body = self.encode(payload)
+        with self.lock, self.db:
+            self.db.execute(("REPLACE" if replace else "INSERT OR IGNORE") + " INTO live (event, body) VALUES (?, ?)", (event, body))
+
+    def save_picks(self, entry, event, picks):
+        body = self.encode(picks)
+        with self.lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO picks (entry, event, body) VALUES (?, ?, ?)", (entry, event, body))
+
+    def load_live(self, event):
+        with self.lock:
+            row = self.db.execute("SELECT body FROM live WHERE event = ?", (event,)).fetchone()
+        return self.decode(row[0]) if row is not None else None
+
+    def load_picks(self, entry, event):
+        with self.lock:
+            row = self.db.execute("SELECT body FROM picks WHERE entry = ? AND event = ?", (entry, event)).fetchone()
+        return self.decode(row[0]) if row is not None else None
+
+    def missing(self, entries, events):
+        # What is still to be archived: the events without a live payload and the (entry, event) picks not saved yet
+        with self.lock:
+            live = {row[0] for row in self.db.execute("SELECT event FROM live")}
+            picks = set(self.db.execute("SELECT entry, event FROM picks"))
+
+        live_missing = [event for event in events if event not in live]
+        picks_missing = [(entry, event) for event in events for entry in entries if (entry, event) not in picks]
+        return live_missing, picks_missing
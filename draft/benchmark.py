@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+
+# Benchmarks the hot paths in fplutils against recorded payloads served by fakeapi.
+#
+#   python draft/benchmark.py [recordings] --output benchmark-results.json --baseline old-results.json
+#
+# Every case is run once cold (fresh Utils, nothing cached) and then repeatedly warm.
+# Allocations are measured on a separate traced run so tracemalloc doesn't skew the timings.
+
+draft_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=draft_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Benchmark:
+
+    def __init__(self, api, iterations):
+        from fplutils import Utils, SharedData
+        from teamImg import TeamImg
+
+        self.api = api
+        self.iterations = iterations
+        self.Utils = Utils
+        self.SharedData = SharedData
+        self.img = TeamImg()
+
+    async def fresh_utils(self):
+        # Utils and SharedData are singletons, drop them so the cold run starts with nothing loaded
+        if self.SharedData._instance is not None:
+            await self.Utils().close()
+        self.Utils._instances.clear()
+        self.SharedData._instance = None
+        self.SharedData._initialized = False
+        return self.Utils()
+
+    async def cases(self, u):
+        await u.ensure_data()
+        gameweek = await u.current_gw()
+        team_id = next(iter(u.model().entries))
+        squad = self.img.squad_from_players(await u.get_squad(u.model().entries[team_id].player_first_name))
+
+        def draw():
+            self.img.create_team_image(self.img.background.copy(), squad)
+
+        async def create_team_image():
+            # Shirt downloads block, so the first render runs in a thread to keep fakeapi serving them
+            if not self.img.shirts.images:
+                await asyncio.to_thread(draw)
+            else:
+                draw()
+
+        return {
+            'get_team_players': lambda: u.get_team_players(),
+            'get_readable_matches': lambda: u.get_readable_matches(),
+            'get_transactions': lambda: u.get_transactions(gameweek),
+            'get_scores': lambda: u.get_scores(gameweek),
+            'calculate_team_bonus': lambda: u.calculate_team_bonus(team_id, gameweek),
+            'get_overview': lambda: u.get_overview(gameweek),
+            'TeamImg.create_team_image': create_team_image,
+        }
+
+    async def run_case(self, name):
+        u = await self.fresh_utils()
+        if name == 'TeamImg.create_team_image':
+            self.img.shirts.images.clear()
+
+        # Cold: includes loading the payloads the function depends on
+        self.api.counts.clear()
+        start = time.perf_counter()
+        case = (await self.cases(u))[name]
+        await case()
+        cold = time.perf_counter() - start
+        upstream = dict(self.api.counts)
+
+        self.api.counts.clear()
+        timings = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            await case()
+            timings.append(time.perf_counter() - start)
+        warm_upstream = sum(self.api.counts.values())
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await case()
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'cold_ms': cold * 1000,
+            'warm_ms': {
+                'median': statistics.median(timings) * 1000,
+                'min': min(timings) * 1000,
+                'max': max(timings) * 1000,
+            },
+            'alloc_peak_kb': (peak - before) / 1024,
+            'alloc_retained_kb': (after - before) / 1024,
+            'upstream_calls': {
+                'cold': upstream,
+                'cold_total': sum(upstream.values()),
+                'warm_per_call': warm_upstream / self.iterations,
+            },
+        }
+
+    async def run(self, names):
+        results = {}
+        for name in names:
+            results[name] = await self.run_case(name)
+            print(f'{name:28} cold {results[name]["cold_ms"]:9.2f}ms  warm {results[name]["warm_ms"]["median"]:9.3f}ms  '
+                  f'peak {results[name]["alloc_peak_kb"]:9.1f}KB  upstream {results[name]["upstream_calls"]["cold_total"]}')
+        await self.Utils().close()
+        return results
+
+
+def compare(results, baseline):
+    print('\nChange against baseline ' + str(baseline.get('version')))
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        warm = result['warm_ms']['median'] / old['warm_ms']['median'] if old['warm_ms']['median'] else float('nan')
+        cold = result['cold_ms'] / old['cold_ms'] if old['cold_ms'] else float('nan')
+        calls = result['upstream_calls']['cold_total'] - old['upstream_calls']['cold_total']
+        print(f'{name:28} cold x{cold:6.2f}  warm x{warm:6.2f}  upstream {calls:+d}')
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix='fplbench-')
+    recordings = args.recordings
+    if recordings is None:
+        from fakeapi import generate
+        recordings = os.path.join(workdir, 'recordings')
+        generate(recordings, args.entries, args.gameweek)
+
+    from fakeapi import FakeApi
+    api = FakeApi(recordings, args.latency)
+    port = free_port()
+    await api.start(port=port)
+
+    # fplutils and shirtcache read these at import time, so set them before anything imports them
+    os.environ['FPL_API_BASE'] = f'http://127.0.0.1:{port}'
+    os.environ['CACHE_DIR'] = os.path.join(workdir, 'cache')
+    os.environ['SNAPSHOT_DB'] = ':memory:'
+    os.environ.setdefault('IMG_FONT', os.path.join(draft_dir, '..', 'fonts', 'Helvetica-Bold.ttf'))
+
+    benchmark = Benchmark(api, args.iterations)
+    names = args.only or ['get_team_players', 'get_readable_matches', 'get_transactions', 'get_scores',
+                          'calculate_team_bonus', 'get_overview', 'TeamImg.create_team_image']
+    results = await benchmark.run(names)
+    await api.stop()
+
+    report = {
+        'version': args.label or git_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'recordings': args.recordings or 'generated',
+        'iterations': args.iterations,
+        'latency': args.latency,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Wrote ' + args.output)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, draft_dir)
+
+    parser = argparse.ArgumentParser(description="Benchmark the fplutils hot paths against recorded payloads")
+    parser.add_argument('recordings', nargs='?', help="Directory written by fakeapi.py record, a synthetic season is generated if omitted")
+    parser.add_argument('--output', default=os.path.abspath('benchmark-results.json'))
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--label', help="Version label stored with the results, defaults to git describe")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated upstream latency in seconds")
+    parser.add_argument('--entries', type=int, default=8)
+    parser.add_argument('--gameweek', type=int, default=10)
+    parser.add_argument('--only', nargs='+', help="Run only these cases")
+    args = parser.parse_args()
+    if args.recordings is not None:
+        args.recordings = os.path.abspath(args.recordings)
+    if args.baseline is not None:
+        args.baseline = os.path.abspath(args.baseline)
+
+    asyncio.run(main(args))
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import metrics
+
+# Optional shared data plane for running several bot processes or shards against one upstream:
+#
+#   python draft/cachedaemon.py --socket /tmp/fpl-cache.sock
+#
+# Bots started with CACHE_SOCKET pointing at the same path fetch through the daemon instead of
+# upstream, and go back to fetching in-process whenever it isn't running.
+#
+# One request per line as JSON: {"endpoint": "details", "args": ["6"], "version": 3}
+# Answered by a JSON header line, followed by the body when the status is "ok":
+#   {"status": "ok", "version": 4, "fetched_at": 1700000000.0, "length": 1234}
+#   {"status": "not_modified", "version": 3, "fetched_at": 1700000000.0}
+#   {"status": "error", "error": "..."}
+# The body is the upstream response exactly as downloaded, so it is never re-encoded on the way through.
+
+SOCKET_PATH = os.getenv('CACHE_SOCKET')
+
+
+class CacheUnavailable(Exception):
+    pass
+
+
+class CacheDaemonError(Exception):
+    pass
+
+
+class CacheEntry:
+    __slots__ = ('version', 'fetched_at', 'body')
+
+    def __init__(self, version, fetched_at, body):
+        self.version = version
+        self.fetched_at = fetched_at
+        self.body = body
+
+
+class CacheDaemon:
+
+    # However many bots ask, each payload is downloaded at most once per max_age
+    max_age = float(os.getenv('CACHE_MAX_AGE_SECONDS', 30))
+
+    def __init__(self, download):
+        # download(endpoint, *args) -> raw response bytes
+        self.download = download
+        self.entries = {}
+        self.inflight = {}
+        self.server = None
+
+    async def start(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+        self.server = await asyncio.start_unix_server(self.handle, path=path)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and time.time() - entry.fetched_at < self.max_age:
+            metrics.cache_result('daemon', True)
+            return entry
+        metrics.cache_result('daemon', False)
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.inflight[key] = asyncio.ensure_future(self.refresh(key))
+            task.add_done_callback(lambda done: self.finish_refresh(key, done))
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            if entry is None:
+                raise
+            # Every bot would only retry upstream itself, an old payload is more use to them
+            print(f'Refresh of {key} failed, serving cached data: {e}')
+            return entry
+
+    def finish_refresh(self, key, task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def refresh(self, key):
+        body = await self.download(*key)
+        entry = self.entries.get(key)
+        if entry is None or entry.body != body:
+            entry = self.entries[key] = CacheEntry(entry.version + 1 if entry is not None else 1, time.time(), body)
+        else:
+            entry.fetched_at = time.time()
+        return entry
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                try:
+                    entry = await self.get((request['endpoint'],) + tuple(request['args']))
+                except Exception as e:
+                    self.reply(writer, {'status': 'error', 'error': str(e)})
+                else:
+                    if entry.version == request.get('version'):
+                        self.reply(writer, {'status': 'not_modified', 'version': entry.version, 'fetched_at': entry.fetched_at})
+                    else:
+                        self.reply(writer, {'status': 'ok', 'version': entry.version, 'fetched_at': entry.fetched_at,
+                                            'length': len(entry.body)}, entry.body)
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            writer.close()
+
+    def reply(self, writer, header, body=None):
+        writer.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        if body is not None:
+            writer.write(body)
+
+
+class CacheClient:
+
+    # After failing to reach the daemon, fetch in-process for a while before trying it again
+    retry_seconds = 30
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self.idle = []
+        # Last version seen per key, unchanged payloads come back as the object already parsed
+        self.known = {}
+        self.down_until = 0
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.down_until
+
+    async def connection(self):
+        while self.idle:
+            reader, writer = self.idle.pop()
+            # The daemon may have restarted since this connection was last used
+            if not reader.at_eof():
+                return reader, writer
+            writer.close()
+        try:
+            return await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            self.down_until = time.monotonic() + self.retry_seconds
+            raise CacheUnavailable(str(e))
+
+    async def fetch(self, endpoint, *args):
+        key = (endpoint,) + tuple(str(arg) for arg in args)
+        # Picks are kept by the caller already, no point holding on to them twice
+        known = self.known.get(key) if endpoint != 'entry' else None
+
+        reader, writer = await self.connection()
+        try:
+            request = {'endpoint': endpoint, 'args': key[1:], 'version': known[0] if known is not None else None}
+            writer.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+            await writer.drain()
+            header = json.loads(await reader.readline())
+            body = await reader.readexactly(header['length']) if header['status'] == 'ok' else None
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            self.down_until = time.monotonic() + self.retry_seconds
+            raise CacheUnavailable(str(e))
+        except BaseException:
+            # Cancelled part way through a reply, the connection can't be reused
+            writer.close()
+            raise
+        self.idle.append((reader, writer))
+
+        metrics.cache_result('daemon_client', header['status'] == 'not_modified')
+        if header['status'] == 'error':
+            raise CacheDaemonError(header['error'])
+        if header['status'] == 'not_modified':
+            return known[1]
+
+        payload = json.loads(body)
+        if endpoint != 'entry':
+            self.known[key] = (header['version'], payload)
+        return payload
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+async def serve(args):
+    from fplutils import Utils
+
+    daemon = CacheDaemon(Utils().download)
+    await daemon.start(args.socket)
+    if args.metrics_port is not None:
+        await metrics.start_server(port=args.metrics_port)
+    print('Cache daemon listening on ' + args.socket)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await daemon.stop()
+        await Utils().close()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Shared upstream cache for several bot processes")
+    parser.add_argument('--socket', default=SOCKET_PATH or '/tmp/fpl-cache.sock')
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args))
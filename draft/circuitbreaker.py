@@ -0,0 +1,46 @@
+import time
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def open(self):
+        return self.opened_at is not None
+
+    def before(self):
+        # Closed: let everything through. Open: fail fast until the reset timeout,
+        # then half-open and let a single probe request decide whether to close again.
+        # Returns True for that probe, whoever gets it has to call release() when it is done
+        if self.opened_at is None:
+            return False
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        if remaining > 0 or self.probing:
+            raise CircuitOpen(f'{self.name} is failing, not retrying for {max(remaining, 0):.0f}s')
+        self.probing = True
+        return True
+
+    def release(self):
+        # The probe ended without a verdict (cancelled, or an error that says nothing about upstream)
+        self.probing = False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
@@ -0,0 +1,47 @@
+import asyncio
+from dotenv import load_dotenv
+from discord.ext import tasks, commands
+from fplutils import Utils
+from shirtcache import ShirtCache
+
+dotenv_path = 'config.env'
+load_dotenv(dotenv_path=dotenv_path)
+
+class DataTasks(commands.Cog):
+
+    def __init__(self, client):
+        self.client = client
+        self.shirts = ShirtCache()
+        self.refresh.start()
+
+    def cog_unload(self):
+        self.refresh.cancel()
+
+    @tasks.loop(seconds=Utils.fast_refresh_seconds)
+    async def refresh(self):
+        try:
+            # Global payloads are shared, so extra leagues only add their own league endpoints
+            leagues = Utils.leagues()
+            await asyncio.gather(*[u.update_data() for u in leagues])
+
+            # Finished gameweeks go to the on-disk archive in the background, old /scores never touch upstream
+            for u in leagues:
+                u.schedule_archive()
+
+            # Live data and shirts are shared, any configured league will do
+            u = leagues[0]
+
+            # Keep the live payload warm while matches are on so /scores and /overview never wait on it
+            if u.matches_live():
+                await u.get_live(u.gw_info["current_event"])
+
+            # Only downloads shirts that aren't cached yet, so /team renders never go to the network
+            shirts = self.shirts.shirts_for_teams(u.data['elements']['teams'])
+            await self.shirts.prefetch(await u.get_session(), shirts)
+        except Exception as e:
+            print('Data refresh failed: ' + str(e))
+
+        self.refresh.change_interval(seconds=Utils.leagues()[0].poll_interval())
+
+def setup(client):
+    client.add_cog(DataTasks(client))
@@ -1,22 +1,34 @@
 import io
+import os
+import json
+import asyncio
 from fplutils import Utils
 from teamImg import TeamImg
+from seasonchart import SeasonChart
+from renderpool import RenderPool, RenderQueueFull
 import discord
 from discord import Option, File, Embed
 from discord.ext import commands
 from dotenv import load_dotenv
-from datetime import datetime, timezone
 
 dotenv_path = 'config.env'
 load_dotenv(dotenv_path=dotenv_path)
 
+async def player_autocomplete(ctx: discord.AutocompleteContext):
+    return Utils.for_guild(ctx.interaction.guild_id).search_players(ctx.value)
+
+async def owner_autocomplete(ctx: discord.AutocompleteContext):
+    return Utils.for_guild(ctx.interaction.guild_id).search_owners(ctx.value)
+
 class FplCommands(commands.Cog):
 
     def __init__(self, client):
         self.client = client
         
         self.img = TeamImg()
-        self.u = Utils()
+        self.chart = SeasonChart()
+        self.renderer = RenderPool()
+        self.bets_file = os.getenv('BETS_FILE', os.path.join(os.path.dirname(os.path.dirname(__file__)), "bets.json"))
 
         self.client.application_command(name="owner", description="Finds the owner for the specified player", cls=discord.SlashCommand)(self.owner)
         # self.client.application_command(name="fixtures", description="Responds with the H2H fixtures for current or specified GW", cls=discord.SlashCommand)(self.fixtures)
@@ -24,44 +36,50 @@ class FplCommands(commands.Cog):
         self.client.application_command(name="waivers", description="Responds with this week's waivers", cls=discord.SlashCommand)(self.waivers)
         self.client.application_command(name="dave", description="Responds with a message for whenever Dave pipes up", cls=discord.SlashCommand)(self.dave)
         self.client.application_command(name="team", description="Responds with an image of the team owned by the specified owner", cls=discord.SlashCommand)(self.team)
+        self.client.application_command(name="teams", description="Responds with an image of every team in the league", cls=discord.SlashCommand)(self.teams)
         self.client.application_command(name="scores", description="Get the scores of the current gameweek (live). Specify GW for previous weeks", cls=discord.SlashCommand)(self.scores)
         self.client.application_command(name="bet", description="Gets the current total goals scored for each bettor's selections", cls=discord.SlashCommand)(self.bet)
         self.client.application_command(name="update", description="Updates the data from FPL API", cls=discord.SlashCommand)(self.update)
         self.client.application_command(name="overview", description="Responds with an overview of this week's fixtures", cls=discord.SlashCommand)(self.overview)
         self.client.application_command(name="standings", description="Responds with the current standings in the league", cls=discord.SlashCommand)(self.standings)
+        self.client.application_command(name="form", description="Responds with the points table over the last few gameweeks", cls=discord.SlashCommand)(self.form)
+        self.client.application_command(name="weeks", description="Responds with every team's best and worst gameweek", cls=discord.SlashCommand)(self.weeks)
+        self.client.application_command(name="history", description="Responds with a chart of every team's points over the season", cls=discord.SlashCommand)(self.history)
         # self.client.application_command(name="h2h", description="Responds with the h2h results between two teams", cls=discord.SlashCommand)(self.h2h)
 
 
 
-    async def owner(self, ctx, *, player_name: Option(str, description="Player's name")):
-        player_df = self.u.get_player_attr(player_name, "team_x")
+    async def owner(self, ctx, *, player_name: Option(str, description="Player's name", autocomplete=player_autocomplete)):
+        u = Utils.for_guild(ctx.guild_id)
+        players = await u.get_players(player_name)
 
-        if player_df.empty:
+        if not players:
             await ctx.respond("Player not found")
             return
 
         response = ''
-        for row in player_df.itertuples():
-            if (type(row.team_x) == str):
-                response += row.first_name + ' ' + row.second_name + ' is owned by: ' + row.team_x + '\n'
+        for player in players:
+            if player.owner_name is not None:
+                response += player.first_name + ' ' + player.second_name + ' is owned by: ' + player.owner_name + '\n'
             else:
-                response += row.first_name + ' ' + row.second_name + ' is a free agent!\n'
+                response += player.first_name + ' ' + player.second_name + ' is a free agent!\n'
 
         embed = Embed(title=response)
         await ctx.respond(embed=embed)
 
 
     async def fixtures(self, ctx, gameweek: Option(int, description="GW to show the fixtures", max_value=38, min_value=1) = 0):
-        matches_df, gameweek = self.u.get_fixtures(gameweek)
+        u = Utils.for_guild(ctx.guild_id)
+        fixtures, gameweek = await u.get_fixtures(gameweek)
 
         embed = Embed(
-            title="Coq au Ian H2H fixtures for GW" + str(gameweek)
+            title=await u.get_league_name() + " H2H fixtures for GW" + str(gameweek)
         )
 
-        spaces = matches_df["home_player"].str.len().max()
-        for row in matches_df.itertuples():
-            home_spaces = spaces - len(row.home_player)
-            response = "```" + row.home_player + home_spaces*" " + "   vs   " + row.away_player + "```"
+        spaces = max((len(fixture.home_player) for fixture in fixtures), default=0)
+        for fixture in fixtures:
+            home_spaces = spaces - len(fixture.home_player)
+            response = "```" + fixture.home_player + home_spaces*" " + "   vs   " + fixture.away_player + "```"
             embed.add_field(
                 name="",
                 value=response,
@@ -71,12 +89,13 @@ class FplCommands(commands.Cog):
         await ctx.respond(embed=embed)
 
     async def standings(self, ctx, normal: Option(bool, description="Show standings based on total points, rather than h2h") = False):
-        standings = self.u.get_standings()
+        u = Utils.for_guild(ctx.guild_id)
+        standings = await u.get_standings()
 
         if (normal == True):
-            title = "Coq au Ian Normal Standings (Total Points)"
+            title = await u.get_league_name() + " Normal Standings (Total Points)"
         else: 
-            title = "Coq au Ian H2H Standings"
+            title = await u.get_league_name() + " H2H Standings"
         
         embed = Embed(
             title=title
@@ -103,77 +122,64 @@ class FplCommands(commands.Cog):
 
             rank += 1
 
+        embed.set_footer(text=u.age_text(u.data_age('details')))
         await ctx.respond(embed=embed)
 
 
 
-    async def teamlist(self, ctx, owner: Option(str, description="Team owner's first name")):
-        team_df = self.u.get_team(owner)
-
-        team_gk_df = team_df.loc[team_df['plural_name'] == 'Goalkeepers']
-        team_def_df = team_df.loc[team_df['plural_name'] == 'Defenders']
-        team_mid_df = team_df.loc[team_df['plural_name'] == 'Midfielders']
-        team_att_df = team_df.loc[team_df['plural_name'] == 'Forwards']
+    async def teamlist(self, ctx, owner: Option(str, description="Team owner's first name", autocomplete=owner_autocomplete)):
+        u = Utils.for_guild(ctx.guild_id)
+        squad = await u.get_squad(owner)
 
         embed = Embed(
             title=owner + "'s Team list"
         )
 
-        gk_string = ""
-        for row in team_gk_df.itertuples():
-            gk_string += row.web_name + " (" + row.short_name + ")\n"
-        embed.add_field(name="GK", value=gk_string, inline=False)
-        
-        def_string = ""
-        for row in team_def_df.itertuples():
-            def_string += row.web_name + " (" + row.short_name + ")\n"
-        embed.add_field(name="DEF", value=def_string, inline=False)
-
-        mid_string = ""
-        for row in team_mid_df.itertuples():
-            mid_string += row.web_name + " (" + row.short_name + ")\n"
-        embed.add_field(name="MID", value=mid_string, inline=False)
-
-        att_string = ""
-        for row in team_att_df.itertuples():
-            att_string += row.web_name + " (" + row.short_name + ")\n"
-        embed.add_field(name="FWD", value=att_string, inline=False)
-        
+        for position, field_name in [("Goalkeepers", "GK"), ("Defenders", "DEF"), ("Midfielders", "MID"), ("Forwards", "FWD")]:
+            position_string = ""
+            for player in squad:
+                if player.position == position:
+                    position_string += player.web_name + " (" + player.team_short_name + ")\n"
+            embed.add_field(name=field_name, value=position_string, inline=False)
+
+        embed.set_footer(text=u.age_text(u.data_age('elements', 'element_status')))
         await ctx.respond(embed=embed)
 
     
     async def waivers(self, ctx, gameweek: Option(int, description="Gameweek to show waivers from", max_value=38, min_value=0) = 0):
+        u = Utils.for_guild(ctx.guild_id)
 
         if (gameweek == 0):
-            gameweek = self.u.current_gw()
-            gw_info = self.u.get_gw_info()
-            if (gw_info["waivers_processed"] == True):
-                gameweek = self.u.current_gw(True)
+            gameweek = await u.current_gw()
+            if (u.gw_info["waivers_processed"] == True):
+                gameweek = await u.current_gw(True)
 
         embed = Embed(
             title="Waivers in GW"+str(gameweek)
         )
         
-        transactions_df = self.u.get_transactions(gameweek)
-        if transactions_df.empty:
+        transactions = await u.get_transactions(gameweek)
+        if not transactions:
             await ctx.respond("Couldn't find any waivers for GW" + str(gameweek))
             return
 
-        for row in transactions_df.itertuples():
-            if row.result == 'a':
-                response = row.short_name + ":  " + row.element_out + "  ->  " + row.element_in + " :white_check_mark:"
+        for transaction in transactions:
+            if transaction.result == 'a':
+                response = transaction.short_name + ":  " + transaction.element_out_name + "  ->  " + transaction.element_in_name + " :white_check_mark:"
                 embed.add_field(
                     name="",
                     value=response,
                     inline=False
                 )
 
+        waiver_time = await u.get_waiver_time()
         embed.add_field(
             name="",
-            value="Next waivers: <t:" + str(int(self.u.get_waiver_time().timestamp())) + ":F>",
+            value="Next waivers: <t:" + str(int(waiver_time.timestamp())) + ":F>",
             inline=False
         )
-        
+
+        embed.set_footer(text=u.age_text(u.data_age('transactions')))
         await ctx.respond(embed=embed)
 
 
@@ -185,45 +191,75 @@ class FplCommands(commands.Cog):
 
 
     # @bot.command(description="Responds with an image of the team owned by the specified owner")
-    async def team(self, ctx, owner: Option(str, description="Team owner's first name")):
-        team_df = self.u.get_team(owner)
-        team_image = self.img.main(team_df)
-        with io.BytesIO() as image_binary:
-            team_image.save(image_binary, 'PNG')
-            image_binary.seek(0)
+    async def team(self, ctx, owner: Option(str, description="Team owner's first name", autocomplete=owner_autocomplete)):
+        u = Utils.for_guild(ctx.guild_id)
+        squad = await u.get_squad(owner)
+        try:
+            team_image = await self.renderer.render(self.img.squad_from_players(squad))
+        except RenderQueueFull:
+            await ctx.respond("Too many teams being drawn right now, try again in a moment")
+            return
+
+        with io.BytesIO(team_image) as image_binary:
             await ctx.respond(owner + "'s team", file=File(fp=image_binary, filename='team_image.png'))
 
-    async def h2h(self, ctx, team1: Option(str, description="Team owner #1"), team2: Option(str, description="Team owner #2")):
-        team1_id = self.u.get_team_id(team1)
+    async def teams(self, ctx):
+        u = Utils.for_guild(ctx.guild_id)
+        await ctx.defer()
+        await u.ensure_data()
+
+        # Straight from the model by entry, so managers sharing a first name each get their own image.
+        # Entries with no players yet (before the draft) are left out
+        model = u.model()
+        entry_ids = [entry_id for entry_id, squad in model.squads.items() if squad]
+        if not entry_ids:
+            await ctx.followup.send("No teams have any players yet")
+            return
+        squads = [self.img.squad_from_players(model.squads[entry_id]) for entry_id in entry_ids]
+
+        try:
+            team_images = await self.renderer.render_many(squads)
+        except RenderQueueFull:
+            await ctx.followup.send("Too many teams being drawn right now, try again in a moment")
+            return
+
+        files = [File(fp=io.BytesIO(image), filename=model.entries[entry_id].entry_name + '_team.png') for entry_id, image in zip(entry_ids, team_images)]
+        # Discord allows up to 10 attachments per message
+        for i in range(0, len(files), 10):
+            await ctx.followup.send(files=files[i:i + 10])
+
+    async def h2h(self, ctx, team1: Option(str, description="Team owner #1", autocomplete=owner_autocomplete), team2: Option(str, description="Team owner #2", autocomplete=owner_autocomplete)):
+        u = Utils.for_guild(ctx.guild_id)
+        team1_id = await u.get_team_id(team1)
         if team1_id == "":
             await ctx.respond("Didn't find team1")
             return
-        team2_id = self.u.get_team_id(team2)
+        team2_id = await u.get_team_id(team2)
         if team2_id == "":
             await ctx.respond("Didn't find team2")
             return
 
-        h2h = self.u.get_h2h(team1_id, team2_id)
+        h2h = await u.get_h2h(team1_id, team2_id)
 
         embed = Embed(
-            title="H2H results: " + team1 + " vs " + team2
+            title="H2H results: " + team1 + " vs " + team2,
+            description="W" + str(h2h.wins) + " D" + str(h2h.draws) + " L" + str(h2h.losses) + "   Points: " + str(h2h.points_for) + " - " + str(h2h.points_against)
         )
-        print(h2h)
-
-        home_str_len = h2h["home_player"].str.len().max()
-        for row in h2h.itertuples():
-            home_spaces = home_str_len - len(row.home_player)
-            match len(str(row.home_score)):
-                case 1: home_score_str = "      " + str(row.home_score)
-                case 2: home_score_str = "     "  + str(row.home_score)
-                case 3: home_score_str = "    " + str(row.home_score)
-
-            match len(str(row.away_score)):
-                case 1: away_score_str = str(row.away_score) + "      "
-                case 2: away_score_str = str(row.away_score) + "     "
-                case 3: away_score_str = str(row.away_score) + "    "
-
-            response = "```" + row.home_player + home_spaces*" " +  home_score_str + " - " + away_score_str + row.away_player + "```"
+
+        home_str_len = max((len(fixture.home_player) for fixture in h2h.matches), default=0)
+        for fixture in h2h.matches:
+            home_spaces = home_str_len - len(fixture.home_player)
+            match len(str(fixture.home_score)):
+                case 1: home_score_str = "      " + str(fixture.home_score)
+                case 2: home_score_str = "     "  + str(fixture.home_score)
+                case 3: home_score_str = "    " + str(fixture.home_score)
+
+            match len(str(fixture.away_score)):
+                case 1: away_score_str = str(fixture.away_score) + "      "
+                case 2: away_score_str = str(fixture.away_score) + "     "
+                case 3: away_score_str = str(fixture.away_score) + "    "
+
+            response = "```" + fixture.home_player + home_spaces*" " +  home_score_str + " - " + away_score_str + fixture.away_player + "```"
             embed.add_field(
                 name="",
                 value=response,
@@ -233,10 +269,11 @@ class FplCommands(commands.Cog):
 
     # @bot.command(description="Get the scores of the current gameweek (live). Specify GW for previous weeks' results.")
     async def scores(self, ctx, gameweek: Option(int, description="Gameweek to get scores for", max_value=38, min_value=1) = 0):
-        scores, gameweek = self.u.get_scores(gameweek)
+        u = Utils.for_guild(ctx.guild_id)
+        scores, gameweek = await u.get_scores(gameweek)
         
         embed = Embed(
-            title="Coq au Ian current scores for GW"+str(gameweek)
+            title=await u.get_league_name() + " current scores for GW"+str(gameweek)
         )
 
         for team_score in scores:
@@ -247,53 +284,42 @@ class FplCommands(commands.Cog):
                 inline=False
             )
 
+        embed.set_footer(text=u.age_text(u.live_age(gameweek)))
         await ctx.respond(embed=embed)
 
     async def overview(self, ctx, matches: Option(str, description="Matches to get scores for", choices=["Today's matches", "Gameweek's matches", "Live matches"])): 
-        fixtures = self.u.get_overview()
+        u = Utils.for_guild(ctx.guild_id)
+        overview = await u.get_overview()
+        views = {"Today's matches": "today", "Gameweek's matches": "gameweek", "Live matches": "live"}
 
         embed = Embed(
             title="Gameweek fixture overview"
         )
 
-        for fixture in fixtures:
-            kickoff_time = datetime.strptime(fixture["kickoff_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-            
-            if matches == "Today's matches":
-                if kickoff_time.date() != datetime.now(timezone.utc).date():
-                    continue
-            elif matches == "Live matches":
-                if fixture["finished"] == True:
-                    continue
-
-            if kickoff_time.timestamp() > datetime.utcnow().timestamp():
-                continue
+        emojis = {
+            "goals_scored": ":soccer: ",
+            "assists": ":a: ",
+            "own_goals": "**OG** ",
+            "red_cards": ":red_square: "
+        }
 
-            fixture_name = "**" + fixture["team_h"] + " " + str(fixture["team_h_score"]) + " - " + str(fixture["team_a_score"]) + " " + fixture["team_a"] + "**"
+        for fixture in overview.view(views[matches]):
+            fixture_name = "**" + fixture.team_h + " " + str(fixture.team_h_score) + " - " + str(fixture.team_a_score) + " " + fixture.team_a + "**"
 
             stat_text = ""
-            for stat in fixture["stats"]:
-                emojis = {
-                    "goals_scored": ":soccer: ",
-                    "assists": ":a: ",
-                    "own_goals": "**OG** ",
-                    "red_cards": ":red_square: "
-                }
-
-                all_stats = stat.get("h", []) + stat.get("a", [])
-
-                for _stat in all_stats:
-                    if stat["s"] in ["penalties_saved", "penalties_missed", "yellow_cards", "saves", "bonus", "bps"]:
-                        continue
-                    value = _stat["value"]
-                    while(value > 0):
-                        stat_text += emojis[stat["s"]]
-                        value -= 1
-                    stat_text += _stat["name"]
-                        
-                    if _stat["owner_name"] is not None:
-                        stat_text += "**   " + _stat["owner_name"] + "**"
-                    stat_text += "\n"
+            for stat in fixture.stats:
+                if stat.stat not in emojis:
+                    continue
+                stat_text += emojis[stat.stat] * stat.value + stat.name
+                if stat.owner_name is not None:
+                    stat_text += "**   " + stat.owner_name + "**"
+                stat_text += "\n"
+
+            for bonus in fixture.provisional_bonus:
+                stat_text += ":star: " * bonus.value + bonus.name
+                if bonus.owner_name is not None:
+                    stat_text += "**   " + bonus.owner_name + "**"
+                stat_text += "\n"
 
             stat_text += "-- -- -- -- -- -- -- -- -- --"
 
@@ -303,56 +329,55 @@ class FplCommands(commands.Cog):
                 inline=False
             )
 
+        embed.set_footer(text=u.age_text(u.live_age(overview.gameweek)))
         await ctx.respond(embed=embed)
 
 
-    # @bot.command(description="Gets the current total goals scored for each bettor's selections")
-    async def bet(self, ctx):
+    async def form(self, ctx, weeks: Option(int, description="Number of gameweeks to include", max_value=38, min_value=1) = 5):
+        u = Utils.for_guild(ctx.guild_id)
         await ctx.defer()
-        bettors = {
-            "Henry" : [
-                {"id": 495, "name": "Porro"}, {"id": 363, "name": "Walker"}, 
-                {"id": 311, "name": "TAA"}, {"id": 25, "name": "Zinchenko"}
-            ],
-            "Jack" : [
-                {"id": 329, "name": "Mac Allister"}, {"id": 360, "name": "Rodri"}, 
-                {"id": 311, "name": "TAA"}, {"id": 16, "name": "Rice"}
-            ], 
-            "Joe" : [
-                {"id": 378, "name": "Mainoo"}, {"id": 48, "name": "McGinn"}, 
-                {"id": 335, "name": "Robertson"}, {"id": 340, "name": "Akanji"}
-            ], 
-            "Hari" : [
-                {"id": 78, "name": "Semenyo"}, {"id": 336, "name": "Szoboszlai"}, 
-                {"id": 350, "name": "Gvardiol"}, {"id": 13, "name": "Odegaard"}
-            ],
-            "Steve" : [
-                {"id": 247, "name": "Iwobi"}, {"id": 217, "name": "Doucoure"}, 
-                {"id": 491, "name": "Johnson"}, {"id": 394, "name": "Guimarães"}
-            ], 
-            "Harry" : [
-                {"id": 593, "name": "De Ligt"}, {"id": 3, "name": "Gabriel"}, 
-                {"id": 322, "name": "Gomez"}, {"id": 19, "name": "Smith-Rowe"}
-            ], 
-            "Dave" : [
-                {"id": 360, "name": "Rodri"}, {"id": 323, "name": "Gravenberch"}, 
-                {"id": 492, "name": "Kulusevski"}, {"id": 391, "name": "Almiron"}
-            ]
-        }
+        season = await u.get_season()
+        points, bench, bonus, columns = season.totals(weeks)
+        if not len(columns):
+            await ctx.followup.send("No gameweeks have been played yet")
+            return
 
         embed = Embed(
-            title = "Goal totals for the bet"
+            title=await u.get_league_name() + " form over GW" + str(columns[0] + 1) + "-" + str(columns[-1] + 1)
         )
 
-        for bettor, team in bettors.items():
-            goals = 0
-            team_str = ""
-            for player in team:
-                goals_df = self.u.get_player_attr_id(player["id"], "goals_scored")
-                goals += goals_df["goals_scored"].item()
-                team_str += "\n " + player["name"] + " (" + str(goals_df["goals_scored"].item()) + ")"
-            response = "```" + bettor + ": " + str(goals) + team_str + "```"
+        entries = u.model().entries
+        names = [entries[entry_id].entry_name for entry_id in season.entry_ids]
+        spaces = max(len(name) for name in names)
+        for row in (-points).argsort(kind="stable"):
+            response = "```" + names[row] + (spaces - len(names[row]))*" " + "  " + str(points[row]).rjust(4) + "   bench " + str(bench[row]).rjust(3) + "   bonus " + str(bonus[row]).rjust(3) + "```"
+            embed.add_field(
+                name="",
+                value=response,
+                inline=False
+            )
+
+        embed.set_footer(text=u.age_text(u.live_age(u.gw_info["current_event"])))
+        await ctx.followup.send(embed=embed)
+
+    async def weeks(self, ctx):
+        u = Utils.for_guild(ctx.guild_id)
+        await ctx.defer()
+        season = await u.get_season()
+        if not len(season.columns(final=True)):
+            await ctx.followup.send("No gameweeks have finished yet")
+            return
+
+        (best_gw, best), (worst_gw, worst) = season.extremes()
+        embed = Embed(
+            title=await u.get_league_name() + " best and worst gameweeks"
+        )
 
+        entries = u.model().entries
+        names = [entries[entry_id].entry_name for entry_id in season.entry_ids]
+        spaces = max(len(name) for name in names)
+        for row in (-best).argsort(kind="stable"):
+            response = "```" + names[row] + (spaces - len(names[row]))*" " + "  best " + str(best[row]).rjust(3) + " (GW" + str(best_gw[row]) + ")   worst " + str(worst[row]).rjust(3) + " (GW" + str(worst_gw[row]) + ")```"
             embed.add_field(
                 name="",
                 value=response,
@@ -361,11 +386,85 @@ class FplCommands(commands.Cog):
 
         await ctx.followup.send(embed=embed)
 
+    async def history(self, ctx):
+        u = Utils.for_guild(ctx.guild_id)
+        await ctx.defer()
+        season = await u.get_season()
+        gameweeks, cumulative = season.cumulative()
+        if not len(gameweeks):
+            await ctx.followup.send("No gameweeks have been played yet")
+            return
+
+        entries = u.model().entries
+        names = [entries[entry_id].entry_name for entry_id in season.entry_ids]
+        chart = await asyncio.to_thread(self.chart.render_png, names, gameweeks, cumulative)
+
+        with io.BytesIO(chart) as image_binary:
+            await ctx.followup.send(await u.get_league_name() + " points over the season", file=File(fp=image_binary, filename='season.png'))
+
+    # @bot.command(description="Gets the current total goals scored for each bettor's selections")
+    async def bet(self, ctx):
+        u = Utils.for_guild(ctx.guild_id)
+        await ctx.defer()
+        bets = self.load_bets()
+
+        # One lookup for every player and attribute across all bets
+        player_ids = {player["id"] for bet in bets for team in bet["bettors"].values() for player in team}
+        attrs = list({bet["attr"] for bet in bets})
+        players_df = await u.get_players_attrs(player_ids, attrs)
+
+        embeds = []
+        for bet in bets:
+            attr = bet["attr"]
+            values = players_df[attr]
+
+            embed = Embed(
+                title = bet["title"]
+            )
+
+            for bettor, team in bet["bettors"].items():
+                player_values = [int(values.get(player["id"], 0)) for player in team]
+                team_str = ""
+                for player, value in zip(team, player_values):
+                    team_str += "\n " + player["name"] + " (" + str(value) + ")"
+                response = "```" + bettor + ": " + str(sum(player_values)) + team_str + "```"
+
+                embed.add_field(
+                    name="",
+                    value=response,
+                    inline=False
+                )
+            embeds.append(embed)
+
+        # Discord allows up to 10 embeds per message
+        for i in range(0, len(embeds), 10):
+            await ctx.followup.send(embeds=embeds[i:i + 10])
+
+    def load_bets(self):
+        # Re-read on every call so bets can be edited without restarting the bot
+        with open(self.bets_file, encoding="utf-8") as f:
+            return json.load(f)
+
     async def update(self, ctx):
-        self.u.update_data(True)
+        # Answer within the latency budget, a slow refresh carries on in the background
+        u = Utils.for_guild(ctx.guild_id)
+        refresh = asyncio.ensure_future(u.update_data(True))
+        done, _ = await asyncio.wait([refresh], timeout=u.latency_budget)
+        if refresh not in done:
+            refresh.add_done_callback(self.report_update)
+            await ctx.respond("Update still running, " + u.age_text(u.data_age(*u.data_keys)).lower())
+            return
 
+        refresh.result()
         await ctx.respond("Data updated")
 
+    def report_update(self, refresh):
+        if not refresh.cancelled() and refresh.exception() is not None:
+            print('Data update failed: ' + str(refresh.exception()))
+
+    def cog_unload(self):
+        self.renderer.shutdown()
+
 
 def setup(client):
 	client.add_cog(FplCommands(client))
\ No newline at end of file
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import traceback
+import asyncio
+from dotenv import load_dotenv
+from discord.ext import commands
+import metrics
+
+dotenv_path = 'config.env'
+load_dotenv(dotenv_path=dotenv_path)
+
+class MetricsServer(commands.Cog):
+
+    def __init__(self, client):
+        self.client = client
+        self.runner = None
+        self.lag_task = None
+        self.started = {}
+
+    def cog_unload(self):
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+        if self.runner is not None:
+            asyncio.create_task(self.runner.cleanup())
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after every reconnect, only start once
+        if self.runner is None:
+            self.runner = await metrics.start_server(port=int(os.getenv('METRICS_PORT', 8080)))
+            self.lag_task = asyncio.create_task(metrics.monitor_loop_lag())
+            print('Serving metrics on port ' + os.getenv('METRICS_PORT', '8080'))
+
+    @commands.Cog.listener()
+    async def on_application_command(self, ctx):
+        self.started[ctx.interaction.id] = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx):
+        self.observe(ctx, 'ok')
+
+    @commands.Cog.listener()
+    async def on_application_command_error(self, ctx, error):
+        self.observe(ctx, 'error')
+
+        # Having any error listener turns off py-cord's default handler, so keep printing what it printed
+        print(f"Ignoring exception in command {ctx.command}:", file=sys.stderr)
+        traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    def observe(self, ctx, status):
+        start = self.started.pop(ctx.interaction.id, None)
+        if start is not None:
+            metrics.command_seconds.labels(ctx.command.qualified_name, status).observe(time.perf_counter() - start)
+
+def setup(client):
+    client.add_cog(MetricsServer(client))
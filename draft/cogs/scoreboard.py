@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+import discord
+from discord import Embed
+from discord.ext import tasks, commands
+from fplutils import Utils
+
+dotenv_path = 'config.env'
+load_dotenv(dotenv_path=dotenv_path)
+
+class Scoreboard(commands.Cog):
+
+    # Confirmed bonus lands a while after the gameweek is marked finished, keep polling for it this long
+    final_window = timedelta(hours=2)
+
+    def __init__(self, client):
+        self.client = client
+
+        # One scoreboard per league, remembered across restarts so the bot keeps editing the same message
+        self.state = {u.league_id: self.load_state(u) for u in Utils.leagues()}
+        self.messages = {}
+        # (gameweek, live version) last applied, and when each gameweek was first seen finished
+        self.applied = None
+        self.finished_at = {}
+        self.update_scoreboard.start()
+
+    def cog_unload(self):
+        self.update_scoreboard.cancel()
+
+    def load_state(self, u):
+        snapshot = u.snapshots.load(u.snapshot_key('scoreboard'))
+        if snapshot is None:
+            return {"gameweek": None, "message_id": None, "scores": None}
+        return snapshot[1]
+
+    async def save_state(self, u):
+        await asyncio.to_thread(u.snapshots.save, u.snapshot_key('scoreboard'), self.state[u.league_id])
+
+    @tasks.loop(seconds=Utils.live_poll_interval.total_seconds())
+    async def update_scoreboard(self):
+        # Live data is shared, so this is the same check for every league
+        leagues = [u for u in Utils.leagues() if u.notification_channel is not None]
+        if not leagues:
+            return
+
+        u = leagues[0]
+        try:
+            await u.ensure_data()
+            gameweek = u.gw_info["current_event"]
+            if u.matches_live():
+                await u.get_live(gameweek)
+            elif u.gw_info["current_event_finished"] == True:
+                finished_at = self.finished_at.setdefault(gameweek, datetime.now())
+                if datetime.now() - finished_at < self.final_window:
+                    # get_live stops refreshing a finished gameweek, so fetch the final payload ourselves
+                    await u.refresh_live(gameweek)
+        except Exception as e:
+            print('Scoreboard live refresh failed: ' + str(e))
+        if not u.gw_info:
+            return
+        gameweek = u.gw_info["current_event"]
+
+        # Driven by the live payload changing, whoever fetched it. The refresher often fetches the one
+        # where the last fixture finishes, after which matches_live() is already False
+        version = u.versions.get(f'live:{gameweek}')
+        if version is None or (gameweek, version) == self.applied:
+            return
+
+        failed = False
+        for u in leagues:
+            try:
+                await self.update_league(u)
+            except Exception as e:
+                failed = True
+                print('Scoreboard update failed for league ' + str(u.league_id) + ': ' + str(e))
+        # Leagues that did update won't post again, their scores haven't changed
+        if not failed:
+            self.applied = (gameweek, version)
+
+    async def update_league(self, u):
+        state = self.state.setdefault(u.league_id, self.load_state(u))
+        gameweek = await u.current_gw()
+        scores, gameweek = await u.get_scores(gameweek)
+
+        posted = [[team_score["team_name"], team_score["points"]] for team_score in scores]
+        if gameweek == state["gameweek"] and posted == state["scores"]:
+            return
+
+        embed = self.scoreboard_embed(await u.get_league_name(), scores, gameweek)
+        if gameweek != state["gameweek"] or not await self.edit(u, embed):
+            channel = await self.client.fetch_channel(u.notification_channel)
+            self.messages[u.league_id] = await channel.send(embed=embed)
+
+        self.state[u.league_id] = {"gameweek": gameweek, "message_id": self.messages[u.league_id].id, "scores": posted}
+        await self.save_state(u)
+
+    @update_scoreboard.before_loop
+    async def wait_until_ready(self):
+        await self.client.wait_until_ready()
+
+    async def edit(self, u, embed):
+        # Returns False if there is no message to edit any more, so a new one gets posted
+        try:
+            message = self.messages.get(u.league_id)
+            if message is None:
+                if self.state[u.league_id]["message_id"] is None:
+                    return False
+                channel = await self.client.fetch_channel(u.notification_channel)
+                message = self.messages[u.league_id] = await channel.fetch_message(self.state[u.league_id]["message_id"])
+            await message.edit(embed=embed)
+            return True
+        except discord.NotFound:
+            self.messages.pop(u.league_id, None)
+            return False
+
+    def scoreboard_embed(self, league_name, scores, gameweek):
+        # Only edited when scores change, so show when that was rather than a relative age that goes stale
+        embed = Embed(
+            title=league_name + " live scores for GW" + str(gameweek),
+            timestamp=datetime.now(timezone.utc)
+        )
+
+        for team_score in scores:
+            response = "```" + team_score["team_name"] + ": " + str(team_score["points"]) + "```"
+            embed.add_field(
+                name="",
+                value=response,
+                inline=False
+            )
+
+        embed.set_footer(text="Last change")
+        return embed
+
+def setup(client):
+    client.add_cog(Scoreboard(client))
@@ -1,4 +1,3 @@
-import os
 import datetime
 from datetime import datetime, timedelta, timezone, time
 import asyncio
@@ -14,13 +13,12 @@ class WaiversTasks(commands.Cog):
 
     def __init__(self, client):
         self.client = client
-        self.notifications_channel = os.getenv('NOTIFICATION_CHANNEL')
-        self.u = Utils()
         self.waiver_reminder.start()
 
     @tasks.loop(hours=24)
     async def waiver_reminder(self):
-        waiver_time = self.u.get_waiver_time()
+        # Waiver deadlines are the same for every league
+        waiver_time = await Utils.leagues()[0].get_waiver_time()
         # waiver_time = datetime.strptime("2023-08-23T10:25:00Z", "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
 
         if (waiver_time.day == datetime.today().day):
@@ -37,8 +35,12 @@ class WaiversTasks(commands.Cog):
         await asyncio.sleep(await self.seconds_until(5,0))
 
     async def notify(self, msg):
-        channel = await self.client.fetch_channel(self.notifications_channel)
-        await channel.send(msg)
+        # Waiver deadlines are global, every league with a channel gets the reminder
+        for u in Utils.leagues():
+            if u.notification_channel is None:
+                continue
+            channel = await self.client.fetch_channel(u.notification_channel)
+            await channel.send(msg)
 
     async def seconds_until(self, hours, minutes):
         given_time = time(hours, minutes)
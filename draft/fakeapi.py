@@ -0,0 +1,334 @@
+import os
+import io
+import json
+import random
+import asyncio
+import argparse
+import collections
+import aiohttp
+from aiohttp import web
+from datetime import datetime, timedelta, timezone
+from PIL import Image
+
+# Stand-in for draft.premierleague.com that replays recorded payloads from a directory:
+#
+#   <dir>/bootstrap-static.json, details.json, element-status.json, transactions.json, game.json
+#   <dir>/live/<gw>.json
+#   <dir>/entry/<entry_id>/<gw>.json
+#
+# Point the bot at it with FPL_API_BASE=http://127.0.0.1:8000
+
+class FakeApi:
+
+    def __init__(self, path, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.payloads = {}
+        self.counts = collections.Counter()
+        self.bytes = collections.Counter()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/api/bootstrap-static', self.handler('elements', lambda request: 'bootstrap-static.json'))
+        app.router.add_get('/api/game', self.handler('game', lambda request: 'game.json'))
+        app.router.add_get('/api/league/{league}/details', self.handler('details', lambda request: 'details.json'))
+        app.router.add_get('/api/league/{league}/element-status', self.handler('element_status', lambda request: 'element-status.json'))
+        app.router.add_get('/api/draft/league/{league}/transactions', self.handler('transactions', lambda request: 'transactions.json'))
+        app.router.add_get('/api/event/{gw}/live', self.handler('live', lambda request: os.path.join('live', request.match_info['gw'] + '.json')))
+        app.router.add_get('/api/entry/{entry}/event/{gw}', self.handler('entry', lambda request: os.path.join('entry', request.match_info['entry'], request.match_info['gw'] + '.json')))
+        app.router.add_get('/img/shirts/standard/{shirt}', self.shirt)
+        app.router.add_get('/_stats', self.stats)
+        app.router.add_post('/_reset', self.reset)
+        return app
+
+    def handler(self, endpoint, filename):
+        async def handle(request):
+            self.counts[endpoint] += 1
+            await self.delay()
+            if self.random.random() < self.error_rate:
+                return web.Response(status=503, text='Injected error')
+
+            body = self.load(filename(request))
+            if body is None:
+                return web.Response(status=404, text='No recording for ' + request.path)
+
+            self.bytes[endpoint] += len(body)
+            return web.Response(body=body, content_type='application/json')
+        return handle
+
+    def load(self, filename):
+        # Read lazily so recordings can be swapped on disk while the server runs
+        path = os.path.join(self.path, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        cached = self.payloads.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'rb') as f:
+                cached = (mtime, f.read())
+            self.payloads[path] = cached
+        return cached[1]
+
+    async def delay(self):
+        latency = self.latency + self.random.uniform(0, self.jitter)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    async def shirt(self, request):
+        self.counts['shirt'] += 1
+        await self.delay()
+
+        # Plain coloured shirt so /team renders without the real assets
+        shirt = request.match_info['shirt']
+        colour = random.Random(shirt).randrange(0xffffff)
+        with io.BytesIO() as image_binary:
+            Image.new('RGBA', (66, 87), '#%06x' % colour).save(image_binary, 'PNG')
+            return web.Response(body=image_binary.getvalue(), content_type='image/png')
+
+    async def stats(self, request):
+        return web.json_response({'requests': self.counts, 'bytes': self.bytes})
+
+    async def reset(self, request):
+        self.counts.clear()
+        self.bytes.clear()
+        return web.json_response({})
+
+    async def start(self, host='127.0.0.1', port=8000):
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        return site
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+
+
+async def record(path, base='https://draft.premierleague.com', league=6):
+    # Save everything the bot reads for one league, up to the current gameweek
+    async with aiohttp.ClientSession(raise_for_status=True) as session:
+        async def get(url):
+            async with session.get(base + url) as r:
+                return await r.json(content_type=None)
+
+        game = await get('/api/game')
+        details = await get('/api/league/{0}/details'.format(league))
+        write_json(os.path.join(path, 'game.json'), game)
+        write_json(os.path.join(path, 'details.json'), details)
+        write_json(os.path.join(path, 'bootstrap-static.json'), await get('/api/bootstrap-static'))
+        write_json(os.path.join(path, 'element-status.json'), await get('/api/league/{0}/element-status'.format(league)))
+        write_json(os.path.join(path, 'transactions.json'), await get('/api/draft/league/{0}/transactions'.format(league)))
+
+        for gw in range(1, game['current_event'] + 1):
+            write_json(os.path.join(path, 'live', str(gw) + '.json'), await get('/api/event/{0}/live'.format(gw)))
+            for entry in details['league_entries']:
+                picks = await get('/api/entry/{0}/event/{1}'.format(entry['entry_id'], gw))
+                write_json(os.path.join(path, 'entry', str(entry['entry_id']), str(gw) + '.json'), picks)
+            print('Recorded GW' + str(gw))
+
+
+def generate(path, entries=8, current_event=10, finished=False, seed=1):
+    # Synthetic season in the same shape as the real API, for when there is nothing recorded
+    rnd = random.Random(seed)
+    start = datetime(2024, 8, 16, 19, 0, tzinfo=timezone.utc)
+
+    def ts(dt):
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    team_names = [("Arsenal", "ARS", 3), ("Aston Villa", "AVL", 7), ("Bournemouth", "BOU", 91), ("Brentford", "BRE", 94),
+                  ("Brighton", "BHA", 36), ("Chelsea", "CHE", 8), ("Crystal Palace", "CRY", 31), ("Everton", "EVE", 11),
+                  ("Fulham", "FUL", 54), ("Ipswich", "IPS", 40), ("Leicester", "LEI", 13), ("Liverpool", "LIV", 14),
+                  ("Man City", "MCI", 43), ("Man Utd", "MUN", 1), ("Newcastle", "NEW", 4), ("Nott'm Forest", "NFO", 17),
+                  ("Southampton", "SOU", 20), ("Spurs", "TOT", 6), ("West Ham", "WHU", 21), ("Wolves", "WOL", 39)]
+    teams = [{"id": i, "name": name, "short_name": short, "code": code, "pulse_id": i}
+             for i, (name, short, code) in enumerate(team_names, 1)]
+    element_types = [
+        {"id": 1, "element_count": 2, "singular_name": "Goalkeeper", "singular_name_short": "GKP", "plural_name": "Goalkeepers", "plural_name_short": "GKP"},
+        {"id": 2, "element_count": 5, "singular_name": "Defender", "singular_name_short": "DEF", "plural_name": "Defenders", "plural_name_short": "DEF"},
+        {"id": 3, "element_count": 5, "singular_name": "Midfielder", "singular_name_short": "MID", "plural_name": "Midfielders", "plural_name_short": "MID"},
+        {"id": 4, "element_count": 3, "singular_name": "Forward", "singular_name_short": "FWD", "plural_name": "Forwards", "plural_name_short": "FWD"},
+    ]
+    surnames = ["Ødegaard", "Saka", "Salah", "Núñez", "Haaland", "Foden", "Son", "Maddison", "Palmer", "Isak",
+                "Gordon", "Mbeumo", "Watkins", "Bowen", "Cunha", "Gvardiol", "Rodri", "Szoboszlai", "Guimarães", "Wissa"]
+
+    elements = []
+    for team in teams:
+        for element_type in [1] * 3 + [2] * 8 + [3] * 8 + [4] * 4:
+            element_id = len(elements) + 1
+            web_name = rnd.choice(surnames) + ("" if element_id <= len(surnames) else " " + str(element_id))
+            elements.append({
+                "id": element_id, "web_name": web_name, "first_name": "Player", "second_name": web_name,
+                "element_type": element_type, "team": team["id"], "status": "a", "draft_rank": element_id,
+                "total_points": 0, "goals_scored": 0, "assists": 0, "goals_conceded": 0, "clean_sheets": 0,
+                "bonus": 0, "red_cards": 0, "yellow_cards": 0, "points_per_game": "0.0"
+            })
+
+    events = [{"id": gw, "name": "Gameweek " + str(gw), "deadline_time": ts(start + timedelta(weeks=gw - 1, hours=-1)),
+               "waivers_time": ts(start + timedelta(weeks=gw - 1, days=-1)),
+               "finished": gw < current_event or (gw == current_event and finished)} for gw in range(1, 39)]
+
+    first_names = ["Joe", "Dave", "Steve", "Henry", "Jack", "Hari", "Harry", "Ian", "Sam", "Tom", "Ben", "Max"]
+    league_entries = [{"id": 100 + i, "entry_id": 1000 + i, "entry_name": "Team " + first_names[i % len(first_names)] + ("" if i < len(first_names) else str(i)),
+                       "player_first_name": first_names[i % len(first_names)] + ("" if i < len(first_names) else str(i)),
+                       "player_last_name": "Smith", "short_name": "T" + str(i), "waiver_pick": i + 1,
+                       "joined_time": ts(start - timedelta(days=30))} for i in range(entries)]
+
+    # Deal squads of 2 GK, 5 DEF, 5 MID, 3 FWD
+    by_type = {element_type["id"]: [e["id"] for e in elements if e["element_type"] == element_type["id"]] for element_type in element_types}
+    for ids in by_type.values():
+        rnd.shuffle(ids)
+    squads = {}
+    for entry in league_entries:
+        squads[entry["entry_id"]] = [by_type[element_type["id"]].pop() for element_type in element_types for _ in range(element_type["element_count"])]
+    owners = {element: entry_id for entry_id, squad in squads.items() for element in squad}
+
+    def live(gw):
+        live_rnd = random.Random(seed * 1000 + gw)
+        live_elements = {}
+        for element in elements:
+            minutes = live_rnd.choice([0, 0, 30, 90, 90, 90])
+            stats = {"minutes": minutes, "goals_scored": live_rnd.choice([0] * 8 + [1, 2]) if minutes else 0,
+                     "assists": live_rnd.choice([0] * 6 + [1]) if minutes else 0, "own_goals": 0, "penalties_saved": 0,
+                     "penalties_missed": 0, "yellow_cards": live_rnd.choice([0] * 9 + [1]) if minutes else 0,
+                     "red_cards": 0, "saves": 0, "bonus": 0, "bps": live_rnd.randint(0, 40) if minutes else 0}
+            stats["total_points"] = (2 if minutes >= 60 else 1 if minutes else 0) + stats["goals_scored"] * 5 + stats["assists"] * 3 - stats["yellow_cards"]
+            live_elements[str(element["id"])] = {"explain": [], "stats": stats}
+
+        fixtures = []
+        order = [team["id"] for team in teams]
+        live_rnd.shuffle(order)
+        for i in range(len(order) // 2):
+            team_h, team_a = order[2 * i], order[2 * i + 1]
+            gw_finished = gw < current_event or (gw == current_event and finished)
+            fixture_stats = []
+            for stat in ["goals_scored", "assists", "own_goals", "penalties_saved", "penalties_missed", "yellow_cards", "red_cards", "saves", "bonus", "bps"]:
+                sides = {}
+                for side, team_id in [("h", team_h), ("a", team_a)]:
+                    sides[side] = [{"element": e["id"], "value": live_elements[str(e["id"])]["stats"][stat]}
+                                   for e in elements if e["team"] == team_id and live_elements[str(e["id"])]["stats"][stat]]
+                fixture_stats.append({"s": stat, "h": sides["h"], "a": sides["a"]})
+            goals = {side: sum(s["value"] for s in fixture_stats[0][side]) for side in ["h", "a"]}
+            fixtures.append({"id": gw * 100 + i, "code": gw * 100 + i, "event": gw, "team_h": team_h, "team_a": team_a,
+                             "team_h_score": goals["h"], "team_a_score": goals["a"], "started": True,
+                             "finished": gw_finished, "finished_provisional": gw_finished or i < len(order) // 4,
+                             "kickoff_time": ts(start + timedelta(weeks=gw - 1, hours=i)), "minutes": 90, "stats": fixture_stats})
+        return {"elements": live_elements, "fixtures": fixtures}
+
+    matches = []
+    standings = {entry["id"]: {"league_entry": entry["id"], "event_total": 0, "last_rank": 0, "rank": 0, "rank_sort": 0, "total": 0,
+                               "matches_won": 0, "matches_drawn": 0, "matches_lost": 0, "points_for": 0, "points_against": 0}
+                 for entry in league_entries}
+    entry_ids = [entry["id"] for entry in league_entries]
+    for gw in range(1, 39):
+        played = gw <= current_event
+        live_data = live(gw) if played else None
+        if played:
+            write_json(os.path.join(path, 'live', str(gw) + '.json'), live_data)
+        rotation = entry_ids[:1] + entry_ids[1:][gw % max(len(entry_ids) - 1, 1):] + entry_ids[1:][:gw % max(len(entry_ids) - 1, 1)]
+        for i in range(len(rotation) // 2):
+            home, away = rotation[i], rotation[-1 - i]
+            points = {}
+            for league_entry in [home, away]:
+                entry_id = league_entry - 100 + 1000
+                if played:
+                    picks = {"picks": [{"element": element, "position": position, "is_captain": position == 1, "is_vice_captain": position == 2, "multiplier": 1}
+                                       for position, element in enumerate(squads[entry_id], 1)],
+                             "entry_history": {}, "subs": []}
+                    write_json(os.path.join(path, 'entry', str(entry_id), str(gw) + '.json'), picks)
+                    points[league_entry] = sum(live_data["elements"][str(element)]["stats"]["total_points"] for element in squads[entry_id][:11])
+                else:
+                    points[league_entry] = 0
+            match_finished = gw < current_event or (gw == current_event and finished)
+            matches.append({"event": gw, "finished": match_finished, "started": played,
+                            "league_entry_1": home, "league_entry_1_points": points[home],
+                            "league_entry_2": away, "league_entry_2_points": points[away],
+                            "winning_league_entry": None, "winning_method": None})
+            if match_finished:
+                for us, them in [(home, away), (away, home)]:
+                    standing = standings[us]
+                    standing["points_for"] += points[us]
+                    standing["points_against"] += points[them]
+                    if points[us] > points[them]:
+                        standing["matches_won"] += 1
+                        standing["total"] += 3
+                    elif points[us] == points[them]:
+                        standing["matches_drawn"] += 1
+                        standing["total"] += 1
+                    else:
+                        standing["matches_lost"] += 1
+
+    ranked = sorted(standings.values(), key=lambda standing: (standing["total"], standing["points_for"]), reverse=True)
+    for rank, standing in enumerate(ranked, 1):
+        standing["rank"] = standing["rank_sort"] = standing["last_rank"] = rank
+
+    transactions = []
+    for gw in range(2, current_event + 2):
+        for entry in league_entries:
+            for _ in range(rnd.randint(0, 3)):
+                transactions.append({"id": len(transactions) + 1, "index": len(transactions) + 1, "added": ts(start + timedelta(weeks=gw - 2, days=5)),
+                                     "element_in": rnd.randint(1, len(elements)), "element_out": rnd.choice(squads[entry["entry_id"]]),
+                                     "entry": entry["entry_id"], "event": gw, "kind": rnd.choice(["w", "f"]), "priority": entry["waiver_pick"],
+                                     "result": rnd.choice(["a", "a", "di", "do"])})
+
+    write_json(os.path.join(path, 'bootstrap-static.json'), {"elements": elements, "element_types": element_types, "teams": teams,
+                                                             "events": {"current": current_event, "data": events, "next": current_event + 1}})
+    write_json(os.path.join(path, 'details.json'), {"league": {"id": 6, "name": "Coq au Ian", "scoring": "h"},
+                                                    "league_entries": league_entries, "matches": matches, "standings": ranked})
+    write_json(os.path.join(path, 'element-status.json'), {"element_status": [
+        {"element": e["id"], "owner": owners.get(e["id"]), "status": "o" if e["id"] in owners else "a", "in_accepted_trade": False}
+        for e in elements]})
+    write_json(os.path.join(path, 'transactions.json'), {"transactions": transactions})
+    write_json(os.path.join(path, 'game.json'), {"current_event": current_event, "current_event_finished": finished,
+                                                 "next_event": current_event + 1, "processing_status": "n",
+                                                 "trades_time_for_approval": False, "waivers_processed": False})
+
+
+async def serve(args):
+    api = FakeApi(args.path, args.latency, args.jitter, args.error_rate)
+    await api.start(args.host, args.port)
+    print('Serving ' + args.path + ' on http://' + args.host + ':' + str(args.port))
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the FPL draft API")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Replay recorded payloads")
+    serve_parser.add_argument('path')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    serve_parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency of up to this many seconds")
+    serve_parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+
+    record_parser = subparsers.add_parser('record', help="Record payloads from the live API")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--base', default='https://draft.premierleague.com')
+    record_parser.add_argument('--league', type=int, default=int(os.getenv('LEAGUE_ID', 6)))
+
+    generate_parser = subparsers.add_parser('generate', help="Write a synthetic season")
+    generate_parser.add_argument('path')
+    generate_parser.add_argument('--entries', type=int, default=8)
+    generate_parser.add_argument('--gameweek', type=int, default=10)
+    generate_parser.add_argument('--finished', action='store_true')
+    generate_parser.add_argument('--seed', type=int, default=1)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        asyncio.run(serve(args))
+    elif args.command == 'record':
+        asyncio.run(record(args.path, args.base.rstrip('/'), args.league))
+    else:
+        generate(args.path, args.entries, args.gameweek, args.finished, args.seed)
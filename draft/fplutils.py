@@ -1,45 +1,342 @@
 import os
-import requests
+import asyncio
+import aiohttp
 import json
-import pandas as pd
 import math
+import time
+import random
+from collections import ChainMap
 import unidecode
 from datetime import datetime, timedelta, timezone
-
-class Utils:
-
-    api = {
-        'transactions': 'https://draft.premierleague.com/api/draft/league/6/transactions',
-        'elements': 'https://draft.premierleague.com/api/bootstrap-static',
-        'details': 'https://draft.premierleague.com/api/league/6/details',
-        'element_status': 'https://draft.premierleague.com/api/league/6/element-status',
-        'game': 'https://draft.premierleague.com/api/game',
-        'live': 'https://draft.premierleague.com/api/event/{}/live',
-        'entry': 'https://draft.premierleague.com/api/entry/{}/event/{}'
-    }
+from nameindex import NameIndex
+from snapshots import SnapshotStore
+from archive import GameweekArchive
+from model import DataModel
+from transactions import TransactionLog
+from matches import MatchIndex
+from livescores import LiveScores
+from overview import Overview
+from season import SeasonMatrix
+from circuitbreaker import CircuitBreaker
+from cachedaemon import CacheClient, CacheUnavailable, SOCKET_PATH
+import metrics
+
+API_BASE = os.getenv('FPL_API_BASE', 'https://draft.premierleague.com').rstrip('/')
+LEAGUE_ID = os.getenv('LEAGUE_ID', '6')
+
+def parse_leagues(value):
+    # LEAGUES="<guild id>:<league id>[:<notification channel id>],..." maps Discord servers to draft leagues
+    guilds = {}
+    channels = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        guild_id, league_id, *channel = item.split(':')
+        guilds[int(guild_id)] = league_id
+        if channel:
+            channels[league_id] = channel[0]
+    return guilds, channels
+
+
+class SharedData:
+    # League-independent payloads (bootstrap-static, game and event live) plus the HTTP session,
+    # fetched once per process however many leagues are being served
 
     _instance = None
     _initialized = False
 
-    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            # Initialize the external API connection here
         return cls._instance
 
-
     def __init__(self):
         if not self._initialized:
-            self.session = requests.session()
+            self.session = None
             self.update_time = datetime.min
-            self.gw_info = self.get_gw_info()
+            self.gw_info = {}
             self.data = {}
-            self.update_data()
+            self.versions = {}
+            self.fetched_at = {}
+            self.derived = {}
+            self.live_cache = {}
+            self.inflight = {}
+            self.breakers = {endpoint: CircuitBreaker(endpoint) for endpoint in Utils.api}
+            self.snapshots = SnapshotStore()
+            self.archive = GameweekArchive()
+            # Shared so backfilling several leagues at once still only makes a few requests at a time
+            self.archive_slots = asyncio.Semaphore(Utils.archive_concurrency)
+            # Set when bots share a cache daemon, see cachedaemon.py
+            self.cache_client = CacheClient(SOCKET_PATH) if SOCKET_PATH else None
             self._initialized = True
 
 
-    def login(self):
+class Utils:
+
+    api = {
+        'transactions': API_BASE + '/api/draft/league/{}/transactions',
+        'elements': API_BASE + '/api/bootstrap-static',
+        'details': API_BASE + '/api/league/{}/details',
+        'element_status': API_BASE + '/api/league/{}/element-status',
+        'game': API_BASE + '/api/game',
+        'live': API_BASE + '/api/event/{}/live',
+        'entry': API_BASE + '/api/entry/{}/event/{}'
+    }
+
+    data_keys = ['transactions', 'elements', 'details', 'element_status']
+    shared_keys = ['elements']
+    league_keys = ['transactions', 'details', 'element_status']
+    guilds, channels = parse_leagues(os.getenv('LEAGUES', ''))
+
+    timeout = aiohttp.ClientTimeout(total=20, connect=5)
+    # bootstrap-static is by far the largest payload, picks and game are tiny
+    endpoint_timeouts = {
+        'transactions': 10,
+        'elements': 15,
+        'details': 10,
+        'element_status': 10,
+        'game': 5,
+        'live': 8,
+        'entry': 5
+    }
+    retries = int(os.getenv('UPSTREAM_RETRIES', 2))
+    retry_backoff = 0.5
+    latency_budget = float(os.getenv('LATENCY_BUDGET_SECONDS', 2))
+    live_poll_interval = timedelta(seconds=int(os.getenv('LIVE_POLL_SECONDS', 60)))
+    fast_refresh_seconds = int(os.getenv('REFRESH_FAST_SECONDS', 60))
+    slow_refresh_seconds = int(os.getenv('REFRESH_SLOW_SECONDS', 900))
+    archive_concurrency = int(os.getenv('ARCHIVE_CONCURRENCY', 4))
+    # Finished gameweeks kept in memory besides the current one, anything older is read back from the archive
+    finished_live_cached = int(os.getenv('LIVE_CACHE_FINISHED', 2))
+
+    # One instance per league, all sharing the same SharedData
+    _instances = {}
+
+    
+    def __new__(cls, league_id=LEAGUE_ID):
+        league_id = str(league_id)
+        if league_id not in cls._instances:
+            instance = super().__new__(cls)
+            instance._initialized = False
+            cls._instances[league_id] = instance
+        return cls._instances[league_id]
+
+
+    def __init__(self, league_id=LEAGUE_ID):
+        if not self._initialized:
+            self.league_id = str(league_id)
+            self.notification_channel = self.channels.get(self.league_id)
+            if self.notification_channel is None and self.league_id == LEAGUE_ID:
+                self.notification_channel = os.getenv('NOTIFICATION_CHANNEL')
+            self.shared = SharedData()
+
+            self.update_time = datetime.min
+            self.seen_game = {}
+            self.league_data = {}
+            self.league_versions = {}
+            self.league_fetched_at = {}
+            # Reads fall through to the shared payloads, so self.data['elements'] works in every league
+            self.data = ChainMap(self.league_data, self.shared.data)
+            self.versions = ChainMap(self.league_versions, self.shared.versions)
+            self.fetched_at = ChainMap(self.league_fetched_at, self.shared.fetched_at)
+            self.derived = {}
+            self.build_times = {}
+            self.picks_cache = {}
+            self.live_scores = {}
+            self.transactions = TransactionLog()
+            self.transactions_version = 0
+            self.archived_through = 0
+            self.archive_task = None
+            self.season = None
+            self.load_snapshot()
+            self._initialized = True
+
+    @classmethod
+    def for_guild(cls, guild_id):
+        # Servers not listed in LEAGUES (and DMs) get the default league
+        return cls(cls.guilds.get(guild_id, LEAGUE_ID))
+
+    @classmethod
+    def leagues(cls):
+        # The leagues polled and notified in the background, LEAGUE_ID only when LEAGUES isn't set.
+        # Servers outside LEAGUES still get the default league on demand through for_guild
+        return [cls(league_id) for league_id in set(cls.guilds.values()) or {LEAGUE_ID}]
+
+    @property
+    def gw_info(self):
+        return self.shared.gw_info
+
+    @property
+    def live_cache(self):
+        return self.shared.live_cache
+
+    @property
+    def inflight(self):
+        return self.shared.inflight
+
+    @property
+    def breakers(self):
+        return self.shared.breakers
+
+    @property
+    def snapshots(self):
+        return self.shared.snapshots
+
+    @property
+    def archive(self):
+        return self.shared.archive
+
+    def snapshot_key(self, key):
+        return key if key in self.shared_keys or key == 'game' else f'{key}:{self.league_id}'
+
+    def load_snapshot(self):
+        # Serve the last saved payloads straight away, the refresher revalidates them in the background
+        start = time.perf_counter()
+        keys = self.data_keys + ['game']
+        snapshots = self.snapshots.load_all([self.snapshot_key(key) for key in keys])
+        if not all(self.snapshot_key(key) in snapshots for key in keys):
+            return
+
+        for key in self.data_keys:
+            fetched_at, payload = snapshots[self.snapshot_key(key)]
+            # Another league may have loaded the shared payloads already
+            if key in self.shared_keys and key in self.shared.data:
+                continue
+            self.set_data(key, payload)
+            self.store(self.fetched_at, key, datetime.fromtimestamp(fetched_at))
+        if not self.shared.gw_info:
+            self.shared.gw_info = snapshots['game'][1]
+            self.shared.update_time = self.fetched_at['elements']
+        self.seen_game = self.shared.gw_info
+        self.update_time = datetime.fromtimestamp(min(snapshots[self.snapshot_key(key)][0] for key in self.league_keys))
+        print(f'Loaded league {self.league_id} snapshot from {self.update_time} in {(time.perf_counter() - start) * 1000:.1f}ms')
+
+    def store(self, chain, key, value):
+        # Writes to a ChainMap go to the league map, shared keys have to be written to the shared one
+        if key in self.shared_keys or key.startswith('live:'):
+            chain.maps[1][key] = value
+        else:
+            chain.maps[0][key] = value
+
+    async def get_session(self):
+        # Created lazily so it is bound to the running event loop
+        shared = self.shared
+        if shared.session is None or shared.session.closed:
+            connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+            shared.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, raise_for_status=True)
+        return shared.session
+
+    async def close(self):
+        if self.shared.session is not None and not self.shared.session.closed:
+            await self.shared.session.close()
+        if self.shared.cache_client is not None:
+            self.shared.cache_client.close()
+
+    def flight(self, key, factory):
+        # Concurrent callers asking for the same thing share one in-flight task and its result
+        task = self.inflight.get(key)
+        metrics.cache_result('inflight', task is not None)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self.finish_flight(key, done))
+        return task
+
+    async def single_flight(self, key, factory):
+        # Shielded so one caller timing out or being cancelled doesn't cancel it for the others
+        return await asyncio.shield(self.flight(key, factory))
+
+    async def revalidate(self, key, factory, stale):
+        # With something already cached, only wait for the refresh up to the latency budget and let it finish in the background
+        task = self.flight(key, factory)
+        if stale is None:
+            return await asyncio.shield(task)
+
+        done, _ = await asyncio.wait([task], timeout=self.latency_budget)
+        if task in done and not task.cancelled() and task.exception() is None:
+            return task.result()
+        if task in done:
+            print(f'Refresh of {key} failed, serving cached data: {task.exception()}')
+
+        metrics.stale_responses.labels(key[0]).inc()
+        return stale
+
+    def finish_flight(self, key, task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved, every waiting caller has already had it raised
+            task.exception()
+
+    async def fetch(self, endpoint, *args):
+        return await self.single_flight((endpoint,) + args, lambda: self.fetch_payload(endpoint, *args))
+
+    async def fetch_payload(self, endpoint, *args):
+        # A running cache daemon does the upstream fetching for every bot process, without one fetch in-process
+        cache_client = self.shared.cache_client
+        if cache_client is not None and cache_client.available:
+            try:
+                return await cache_client.fetch(endpoint, *args)
+            except CacheUnavailable as e:
+                print('Cache daemon unavailable, fetching in-process: ' + str(e))
+        return await self.request(endpoint, *args)
+
+    async def request(self, endpoint, *args):
+        return json.loads(await self.download(endpoint, *args))
+
+    async def download(self, endpoint, *args):
+        breaker = self.breakers[endpoint]
+        for attempt in range(self.retries + 1):
+            probe = breaker.before()
+            try:
+                body = await self.get(endpoint, *args)
+            except Exception as e:
+                if not self.retryable(e):
+                    # A 404 and the like is still upstream answering, so it doesn't count against the breaker
+                    if isinstance(e, aiohttp.ClientResponseError):
+                        breaker.success()
+                        metrics.circuit_open.labels(endpoint).set(0)
+                    raise
+                breaker.failure()
+                metrics.circuit_open.labels(endpoint).set(int(breaker.open))
+                if attempt == self.retries or breaker.open:
+                    raise
+                metrics.upstream_retries.labels(endpoint).inc()
+                # Full jitter, so callers that failed together don't all retry together
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+            else:
+                breaker.success()
+                metrics.circuit_open.labels(endpoint).set(0)
+                return body
+            finally:
+                # A probe that was cancelled or failed some other way must not leave the breaker waiting on it forever
+                if probe:
+                    breaker.release()
+
+    def retryable(self, e):
+        # Timeouts, dropped connections, rate limiting and server errors; anything else won't improve on retry
+        if isinstance(e, aiohttp.ClientResponseError):
+            return e.status == 429 or e.status >= 500
+        return isinstance(e, (asyncio.TimeoutError, aiohttp.ClientConnectionError))
+
+    async def get(self, endpoint, *args):
+        session = await self.get_session()
+        timeout = aiohttp.ClientTimeout(total=self.endpoint_timeouts[endpoint], connect=3)
+        start = time.perf_counter()
+        try:
+            async with session.get(self.api[endpoint].format(*args), timeout=timeout) as r:
+                body = await r.read()
+        except aiohttp.ClientResponseError as e:
+            metrics.upstream_requests.labels(endpoint, e.status).inc()
+            raise
+        except Exception:
+            metrics.upstream_requests.labels(endpoint, 'error').inc()
+            raise
+
+        metrics.upstream_seconds.labels(endpoint).observe(time.perf_counter() - start)
+        metrics.upstream_requests.labels(endpoint, r.status).inc()
+        metrics.upstream_bytes.labels(endpoint).inc(len(body))
+        return body
+
+    async def login(self):
         url = 'https://users.premierleague.com/accounts/login/'
         payload = {
         'password': os.getenv('PWD'),
@@ -47,46 +344,155 @@ class Utils:
         'redirect_uri': 'https://fantasy.premierleague.com/a/login',
         'app': 'plfpl-web'
         }
-        self.session.post(url, data=payload)
+        session = await self.get_session()
+        async with session.post(url, data=payload):
+            pass
 
-    def update_data(self, force=False):
-        now = datetime.now()
-        gw_info = self.get_gw_info()
+    async def ensure_data(self):
+        # Freshness is owned by the DataTasks refresher, readers only load data if there is none yet
+        if not all(key in self.data for key in self.data_keys) or not self.gw_info:
+            await self.update_data()
+
+    async def update_data(self, force=False):
+        # Everyone arriving after the hourly expiry or a waivers flip waits on the same refresh
+        return await self.single_flight(('update_data', self.league_id, force), lambda: self.load_data(force))
+
+    async def load_data(self, force=False):
+        # Every league waits on the same shared refresh, then fetches only its own endpoints
+        await self.single_flight(('update_shared', force), lambda: self.load_shared_data(force))
 
-        data = {}
+        now = datetime.now()
+        gw_info = self.gw_info
         if  (
                 self.update_time < (now - timedelta(hours=1))
                 or
-                self.gw_info["current_event"] != gw_info["current_event"]
+                self.seen_game.get("current_event") != gw_info["current_event"]
                 or 
-                self.gw_info["waivers_processed"] != gw_info["waivers_processed"]
+                self.seen_game.get("waivers_processed") != gw_info["waivers_processed"]
                 or 
                 force == True
             ):
-                print('Calling for data from FPL API')
-                self.data['transactions'] = self.session.get(self.api['transactions']).json()
-                self.data['elements'] = self.session.get(self.api['elements']).json()
-                self.data['details'] = self.session.get(self.api['details']).json()
-                self.data['element_status'] = self.session.get(self.api['element_status']).json()
-                self.gw_info = gw_info
+                print('Calling for league ' + self.league_id + ' data from FPL API')
+                await self.save_payloads(self.league_keys, await asyncio.gather(*[self.fetch(key, self.league_id) for key in self.league_keys]), now)
                 self.update_time = now
+                self.seen_game = gw_info
+
+    async def load_shared_data(self, force=False):
+        shared = self.shared
+        now = datetime.now()
+        gw_info = await self.get_gw_info()
+
+        if  (
+                shared.update_time < (now - timedelta(hours=1))
+                or
+                shared.gw_info.get("current_event") != gw_info["current_event"]
+                or 
+                shared.gw_info.get("waivers_processed") != gw_info["waivers_processed"]
+                or 
+                force == True
+            ):
+                print('Calling for shared data from FPL API')
+                await self.save_payloads(self.shared_keys, await asyncio.gather(*[self.fetch(key) for key in self.shared_keys]), now)
+                shared.update_time = now
+
+        if gw_info != shared.gw_info:
+            await asyncio.to_thread(self.snapshots.save, 'game', gw_info)
+        shared.gw_info = gw_info
+
+    async def save_payloads(self, keys, payloads, now):
+        for key, payload in zip(keys, payloads):
+            self.store(self.fetched_at, key, now)
+            if self.set_data(key, payload):
+                await asyncio.to_thread(self.snapshots.save, self.snapshot_key(key), payload, now.timestamp())
+            else:
+                await asyncio.to_thread(self.snapshots.touch, self.snapshot_key(key), now.timestamp())
+
+    def poll_interval(self):
+        if self.matches_live() or self.waivers_pending():
+            return self.fast_refresh_seconds
+        return self.slow_refresh_seconds
+
+    def matches_live(self):
+        if not self.gw_info or self.gw_info["current_event_finished"] == True:
+            return False
+
+        cached = self.live_cache.get(self.gw_info["current_event"])
+        if cached is None:
+            # No fixture times yet, poll fast until we know more
+            return True
+
+        now = datetime.now(timezone.utc)
+        for fixture in cached[1]["fixtures"]:
+            if fixture["finished_provisional"] == True or fixture["kickoff_time"] is None:
+                continue
+            kickoff_time = self.parse_time(fixture["kickoff_time"])
+            if kickoff_time - timedelta(minutes=10) <= now <= kickoff_time + timedelta(hours=3):
+                return True
+        return False
+
+    def waivers_pending(self):
+        if not self.gw_info or self.gw_info["waivers_processed"] == True:
+            return False
+
+        events = self.data['elements']['events']['data']
+        gw = self.gw_info["current_event"]
+        if gw >= len(events):
+            return False
 
-    def get_waiver_time(self, gw=0):
-        if not self.data:
-            self.update_data()
+        waiver_time = self.parse_time(events[gw]['waivers_time'])
+        now = datetime.now(timezone.utc)
+        return waiver_time - timedelta(minutes=10) <= now <= waiver_time + timedelta(hours=2)
+
+    def parse_time(self, ts):
+        return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+    def set_data(self, key, payload):
+        # Only bump the version when the payload actually changed, so derived tables survive no-op refreshes
+        if self.data.get(key) != payload:
+            self.store(self.data, key, payload)
+            self.store(self.versions, key, self.versions.get(key, 0) + 1)
+            return True
+        return False
+
+    def memoize(self, name, deps, build, extra=()):
+        # extra is anything else the value depends on, it becomes part of the version so the old value is replaced
+        version = tuple(self.versions.get(dep, 0) for dep in deps) + tuple(extra)
+        # Tables built only from shared payloads are shared by every league too
+        derived = self.shared.derived if all(dep in self.shared_keys or dep.startswith('live:') for dep in deps) else self.derived
+        cached = derived.get(name)
+        if cached is not None and cached[0] == version:
+            metrics.cache_result('derived', True)
+            return cached[1]
+        metrics.cache_result('derived', False)
+
+        start = time.perf_counter()
+        value = build()
+        self.build_times[name] = time.perf_counter() - start
+        print(f'Built {name} in {self.build_times[name] * 1000:.1f}ms')
+
+        derived[name] = (version, value)
+        return value
+
+    async def get_waiver_time(self, gw=0):
+        await self.ensure_data()
         if gw == 0:
-            gw = self.current_gw()
-            gw_info = self.get_gw_info()
-            if (gw_info["waivers_processed"] == True):
-                gw = self.current_gw(True)
+            gw = await self.current_gw()
+            if (self.gw_info["waivers_processed"] == True):
+                gw = await self.current_gw(True)
         
         ts = self.data['elements']['events']['data'][gw]['waivers_time']
-        return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        return self.parse_time(ts)
 
 
-    def get_data(self, df_name):
-        self.update_data()
-        
+    async def get_data(self, df_name):
+        await self.ensure_data()
+
+        return self.build_data(df_name)
+
+    def build_data(self, df_name):
+        # pandas is only needed for the analytical frames, so keep it off the startup path
+        import pandas as pd
+
         # Dataframes from the details.json
         if df_name == 'league_entries':
             league_entry_df = pd.json_normalize(self.data['details']['league_entries'])
@@ -131,14 +537,21 @@ class Utils:
                 
             return element_status_df
 
-    def get_team_players(self):
+    async def get_team_players(self):
+        await self.ensure_data()
+
+        # Shared between callers, treat it as read-only
+        return self.memoize('team_players', ['element_status', 'elements', 'details'], self.build_team_players)
+
+    def build_team_players(self):
+        import pandas as pd
         
         # Pull the required dataframes
-        element_status_df = self.get_data('element_status')
-        elements_df = self.get_data('elements')
-        element_types_df = self.get_data('element_types')
-        league_entry_df = self.get_data('league_entries')
-        teams_df = self.get_data('teams')
+        element_status_df = self.build_data('element_status')
+        elements_df = self.build_data('elements')
+        element_types_df = self.build_data('element_types')
+        league_entry_df = self.build_data('league_entries')
+        teams_df = self.build_data('teams')
         
         # Built the initial player -> team dataframe
         players_df = (pd.merge(element_status_df,
@@ -202,23 +615,23 @@ class Utils:
                                right_on='id')
                         .drop(
                             columns=[
-                            'code',
                             'id',
                             'pulse_id'
                         ])
-                        .rename(columns={'name':'team_name'}))
+                        .rename(columns={'name':'team_name', 'code':'team_code'}))
 
         players_df['web_name'] = players_df['web_name'].apply(self.remove_accents)
 
         return players_df
 
-    def get_player_attr(self, player: str, attr: str):
-        players_df = self.get_team_players()
+    async def get_player_attr(self, player: str, attr: str):
+        players_df = await self.get_team_players()
 
         if attr not in players_df.columns:
             raise ValueError(f'Attribrute \'{attr}\' is not available for players')
 
-        selected_players_df = players_df.loc[players_df['web_name'].str.lower() == player.lower()]
+        player_ids = self.player_index().lookup(player)
+        selected_players_df = players_df.loc[players_df['element'].isin(player_ids)]
         selected_players_df = selected_players_df[[
             'first_name',
             'second_name',
@@ -226,20 +639,76 @@ class Utils:
         ]]
         return selected_players_df
     
-    def get_team_id(self, team_owner: str):
-        league_entries = self.get_data("league_entries")
+    async def get_team_id(self, team_owner: str):
+        await self.ensure_data()
 
-        team_df = league_entries[league_entries['player_first_name'].str.lower() == team_owner.lower()]
+        owners = self.owner_index().lookup(team_owner)
 
         entry_id = ""
-        if not team_df.empty:
-            entry_id = team_df['entry_id'].iloc[0]
+        if owners:
+            entry_id = owners[0]['entry_id']
 
         return entry_id
 
+    def model(self):
+        return self.memoize('model', ['elements', 'details', 'element_status'], lambda: DataModel(
+            self.data['elements'], self.data['details'], self.data['element_status']
+        ))
+
+    async def get_players(self, player: str):
+        await self.ensure_data()
+
+        model = self.model()
+        return [model.players[player_id] for player_id in self.player_index().lookup(player)]
+
+    async def get_players_by_id(self, player_ids):
+        await self.ensure_data()
 
-    def get_player_attr_id(self, player_id: int, attr: str):
-        players_df = self.get_team_players()
+        players = self.model().players
+        return {player_id: players[player_id] for player_id in player_ids if player_id in players}
+
+    async def get_squad(self, owner: str):
+        await self.ensure_data()
+
+        model = self.model()
+        squad = [player for entry in self.owner_index().lookup(owner) for player in model.squads[entry['entry_id']]]
+        if not squad:
+            raise ValueError(f'No players owned by: {owner}')
+
+        return squad
+
+    async def get_owners(self):
+        await self.ensure_data()
+
+        return [entry.player_first_name for entry in self.model().entries.values()]
+
+    def player_index(self):
+        players = self.data['elements']['elements']
+        return self.memoize('player_index', ['elements'], lambda: NameIndex(
+            [(player['web_name'], player['id']) for player in players] +
+            [(player['first_name'] + ' ' + player['second_name'], player['id']) for player in players]
+        ))
+
+    def owner_index(self):
+        owners = self.data['details']['league_entries']
+        return self.memoize('owner_index', ['details'], lambda: NameIndex(
+            [(owner['player_first_name'], owner) for owner in owners]
+        ))
+
+    def search_players(self, text: str):
+        # Used by autocomplete, so only ever reads data that is already loaded
+        if 'elements' not in self.data:
+            return []
+        return self.player_index().search(text)
+
+    def search_owners(self, text: str):
+        if 'details' not in self.data:
+            return []
+        return self.owner_index().search(text)
+
+
+    async def get_player_attr_id(self, player_id: int, attr: str):
+        players_df = await self.get_team_players()
 
         if attr not in players_df.columns:
             raise ValueError(f'Attribute \'{attr}\' is not available for players')
@@ -252,9 +721,24 @@ class Utils:
         ]]
         return selected_players_df
 
-    def get_team(self, owner: str, pos: str=None):
-        players_df = self.get_team_players()
-        team_df = players_df.loc[players_df['team_x'].str.lower() == owner.lower()]
+    async def get_players_attrs(self, player_ids, attrs):
+        players_df = await self.get_team_players()
+
+        missing = [attr for attr in attrs if attr not in players_df.columns]
+        if missing:
+            raise ValueError(f'Attributes {missing} are not available for players')
+
+        selected_players_df = players_df.loc[
+            players_df['element'].isin(player_ids),
+            ['element', 'first_name', 'second_name'] + list(attrs)
+        ]
+        return selected_players_df.set_index('element')
+
+    async def get_team(self, owner: str, pos: str=None):
+        players_df = await self.get_team_players()
+        owners = self.owner_index().lookup(owner)
+        owner_names = [entry['player_first_name'] for entry in owners]
+        team_df = players_df.loc[players_df['team_x'].isin(owner_names)]
         if pos is not None:
             team_df = team_df.loc[players_df['plural_name'].str.lower() == pos.lower()]
 
@@ -263,141 +747,139 @@ class Utils:
 
         return team_df
     
-    def get_readable_matches(self):
-        matches_df = self.get_data('matches')
-        league_entry_df = self.get_data('league_entries')
-
-        # Join to get team names and player names of entry 1 (home team)
-        matches_df = (pd.merge(matches_df,
-                            league_entry_df[['id', 'player_first_name', 'entry_id']],
-                            how='left',
-                            left_on='league_entry_1',
-                            right_on='id')
-                        .rename(columns={'entry_id':'entry_id_home'
-                                })
-                    )
-
-        # Join to get team names and player names of entry 2 (away team)
-        matches_df = (pd.merge(matches_df,
-                            league_entry_df[['id', 'player_first_name', 'entry_id']],
-                            how='left',
-                            left_on='league_entry_2',
-                            right_on='id')
-                        .rename(columns={'entry_id':'entry_id_away'})
-                    )
-
-        # Drop unused columns, rename for clearer columns
-        matches_df = (matches_df
-                    .drop(['started', 'id_x', 'id_y'], axis=1)
-                    .rename(columns={'event':'match',
-                            'player_first_name_x': 'home_player',
-                            'league_entry_1_points': 'home_score',
-                            'player_first_name_y': 'away_player',
-                            'league_entry_2_points': 'away_score',
-                            })
-                    )
-        return matches_df
-
-    def get_fixtures(self, gw=0):
+    async def get_readable_matches(self):
+        await self.ensure_data()
+        return self.match_index().fixtures
+
+    def match_index(self):
+        return self.memoize('match_index', ['details'], lambda: MatchIndex(self.data['details']))
+
+    async def get_fixtures(self, gw=0):
+        await self.ensure_data()
         if gw == 0:
-            gw = self.current_gw()
+            gw = await self.current_gw()
             if self.gw_info["current_event_finished"] == True:
                 gw += 1
 
-        matches_df = self.get_readable_matches()
-
-        fixtures = matches_df.loc[matches_df['match'] == gw]
-
-        return fixtures, gw
+        return self.match_index().for_event(gw), gw
     
-    def get_h2h(self, team1_id, team2_id):
-        matches_df = self.get_readable_matches()
-        
-        h2h = matches_df.loc[
-            (((matches_df['entry_id_home'] == team1_id) & (matches_df['entry_id_away'] == team2_id)) |
-            ((matches_df['entry_id_away'] == team1_id) & (matches_df['entry_id_home'] == team2_id)))  &
-            (matches_df['finished'] == True)
-        ]
+    async def get_h2h(self, team1_id, team2_id):
+        await self.ensure_data()
+        return self.match_index().between(team1_id, team2_id)
 
-        return h2h
-
-    def get_transactions(self, gw=0):
-        transactions_df = self.get_data('transactions')
-        players_df = self.get_data('elements')
-        league_entries_df = self.get_data('league_entries')
-
-        transactions_df = (pd.merge(transactions_df,
-                                players_df[['web_name', 'id']],
-                                how='left',
-                                left_on='element_in',
-                                right_on='id')
-                            .drop(['element_in'], axis=1)
-                            .rename(columns={'web_name':'element_in'}))
-
-        transactions_df = (pd.merge(transactions_df,
-                                players_df[['web_name', 'id']],
-                                how='left',
-                                left_on='element_out',
-                                right_on='id')
-                            .drop(['element_out', 'id_x', 'id_y', 'id'], axis=1)
-                            .rename(columns={'web_name':'element_out'}))
-
-        transactions_df = (pd.merge(transactions_df,
-                                league_entries_df,
-                                how='left',
-                                left_on='entry',
-                                right_on='entry_id')
-                            .drop(['entry', 'id', 'waiver_pick', 'joined_time', 'entry_id', 'entry_name', 'priority'], axis=1)
-                            .rename(columns={'index':'i'}))
+    async def get_transactions(self, gw=0):
+        await self.ensure_data()
+        log = self.transaction_log()
         if gw != 0:
-            transactions_df = transactions_df.loc[transactions_df['event'] == gw]
-
-        transactions_df = transactions_df.sort_values(by=['event', 'i'], axis=0, ascending=True)
-
-        return transactions_df
+            return log.for_event(gw)
+        return log.all()
+
+    def transaction_log(self):
+        # The payload is the whole season, only transactions we haven't seen before are ingested
+        version = self.versions.get('transactions', 0)
+        if self.transactions_version != version:
+            start = time.perf_counter()
+            added = self.transactions.ingest(self.data['transactions'], self.model())
+            self.transactions_version = version
+            print(f'Ingested {added} transactions in {(time.perf_counter() - start) * 1000:.1f}ms')
+        return self.transactions
     
-    def get_standings(self):     
-        url = self.api["details"]
-        details = self.session.get(url).json()
-        standings = details["standings"]
-        owners = details["league_entries"]
-
-        owner_id_to_name = {owner["id"]: owner['entry_name'] for owner in owners}
+    async def get_standings(self):     
+        await self.ensure_data()
+        league_entries = self.model().league_entries
+        # Copy so the snapshot itself is never modified
+        standings = [dict(standing) for standing in self.data["details"]["standings"]]
 
         for standing in standings: 
-            standing["entry_name"] = owner_id_to_name.get(standing["league_entry"], "Unknown Entry")
+            entry = league_entries.get(standing["league_entry"])
+            standing["entry_name"] = entry.entry_name if entry is not None else "Unknown Entry"
 
         return standings
 
-    def get_scores(self, gameweek=0):
+    async def get_scores(self, gameweek=0):
+        await self.ensure_data()
         if gameweek == 0:
-            gameweek = self.current_gw()
+            gameweek = await self.current_gw()
 
-        team_details = self.session.get(self.api["details"]).json()
-        
-        scores = {}
-        for team in team_details['league_entries']:
-            points = 0
-            points += self.get_team_scores_no_bonus(team['entry_id'], gameweek)
-            points += self.calculate_team_bonus(team['entry_id'], gameweek)
-
-            scores[team['entry_id']] = {}
-            scores[team['entry_id']]["team_name"] = team["entry_name"]
-            scores[team['entry_id']]["points"] = points
-            scores[team['entry_id']]["league_entry"] = team["id"]
-
-        scores_by_entry = {team["league_entry"]: team for team in scores.values()}
-        sorted_scores = [scores_by_entry[entry["league_entry"]] for entry in team_details["standings"] if entry["league_entry"] in scores_by_entry]
+        engine = await self.get_live_scores(gameweek)
+        league_entries = self.model().entries
+
+        scores_by_entry = {}
+        for entry_id, points in engine.totals.items():
+            team = league_entries.get(entry_id)
+            if team is not None:
+                scores_by_entry[team.id] = {"team_name": team.entry_name, "points": points, "league_entry": team.id}
+
+        sorted_scores = [scores_by_entry[entry["league_entry"]] for entry in self.data['details']["standings"] if entry["league_entry"] in scores_by_entry]
         
         return sorted_scores, gameweek
+
+    async def get_live_scores(self, gameweek):
+        await self.get_live(gameweek)
+
+        engine = self.live_scores.get(gameweek)
+        if engine is None or set(engine.picks) != set(self.model().entries):
+            engine = await self.single_flight(('live_scores', self.league_id, gameweek), lambda: self.build_live_scores(gameweek))
+
+        # Read after the build, a refresh may have landed (or the gameweek been evicted) while the picks were being fetched
+        await self.get_live(gameweek)
+        version, live_data, bonus_table = self.current_live(gameweek)
+        engine.update(version, live_data, bonus_table["provisional"])
+        return engine
+
+    async def build_live_scores(self, gameweek):
+        # Picks are fetched once per gameweek, every poll after that only applies the changed elements
+        entry_ids = list(self.model().entries)
+        active_teams = await asyncio.gather(*[self.get_active_team(entry_id, gameweek) for entry_id in entry_ids])
+        engine = LiveScores(gameweek, dict(zip(entry_ids, active_teams)))
+        if gameweek <= self.gw_info["current_event"]:
+            self.live_scores[gameweek] = engine
+        return engine
     
-    def get_team_scores_no_bonus(self, team_id, gameweek=0):
+    async def get_season(self):
+        await self.ensure_data()
+        return await self.single_flight(('season', self.league_id), self.update_season)
+
+    async def update_season(self):
+        # Finished gameweeks are filled once (from the archive after the first time), then only the live one is rebuilt
+        entry_ids = list(self.model().entries)
+        if self.season is None or self.season.entry_ids != entry_ids:
+            self.season = SeasonMatrix(entry_ids, len(self.data['elements']['events']['data']))
+
+        start = time.perf_counter()
+        built = 0
+        last_finished = self.last_finished_gw()
+        for gameweek in range(1, min(self.gw_info["current_event"], self.season.gameweeks) + 1):
+            finished = gameweek <= last_finished
+            if finished and self.season.sources.get(gameweek) == 'final':
+                continue
+
+            await self.get_live(gameweek)
+            if self.season.sources.get(gameweek) == ('final' if finished else self.versions.get(f'live:{gameweek}')):
+                continue
+
+            picks = await asyncio.gather(*[self.get_picks(entry_id, gameweek) for entry_id in entry_ids])
+            squads = {entry_id: [item["element"] for item in sorted(entry_picks, key=lambda item: item["position"])]
+                      for entry_id, entry_picks in zip(entry_ids, picks)}
+            await self.get_live(gameweek)
+            version, live_data, bonus_table = self.current_live(gameweek)
+            self.season.set_gameweek(gameweek, 'final' if finished else version, live_data, squads, bonus_table["provisional"])
+            built += 1
+        if built:
+            print(f'Built {built} season gameweeks for league {self.league_id} in {(time.perf_counter() - start) * 1000:.1f}ms')
+
+        return self.season
+
+    async def get_team_scores_no_bonus(self, team_id, gameweek=0):
         if gameweek == 0:
-            gameweek = self.current_gw()
+            gameweek = await self.current_gw()
+
+        active_team = await self.get_active_team(team_id, gameweek)
+        live_data = await self.get_live(gameweek)
 
-        active_team = self.get_active_team(team_id, gameweek)
-        live_data = self.session.get(self.api["live"].format(gameweek)).json()
+        return self.sum_team_points_no_bonus(active_team, live_data)
 
+    def sum_team_points_no_bonus(self, active_team, live_data):
         points = 0
         for player in active_team:
             try: 
@@ -409,135 +891,253 @@ class Utils:
         return points
                 
     
-    def get_team_bonus(self, team_id, gameweek=0):
+    async def get_team_bonus(self, team_id, gameweek=0):
         if gameweek == 0:
-            gameweek = self.current_gw()
+            gameweek = await self.current_gw()
 
-        active_team = self.get_active_team(team_id, gameweek)
+        active_team = await self.get_active_team(team_id, gameweek)
+        await self.get_live(gameweek)
 
-        url = self.api["live"].format(gameweek)
-        fixtures = self.session.get(url).json()["fixtures"]
-
-        bonus_points = 0
-        for fixture in fixtures: 
-            for stat in fixture["stats"]:
-                if stat["s"] == "bonus":
-                    stat_bonus = stat["a"] + stat["h"]
-                    for bonus in stat_bonus:
-                        if bonus["element"] in active_team: 
-                            bonus_points += bonus["value"]
-
-        return bonus_points
+        return self.sum_team_bonus(active_team, self.get_bonus_table(gameweek)["confirmed"])
     
-    def calculate_team_bonus(self, team_id, gameweek=0):
+    async def calculate_team_bonus(self, team_id, gameweek=0):
         if gameweek == 0:
-            gameweek = self.current_gw()
-
-        active_team = self.get_active_team(team_id, gameweek)
+            gameweek = await self.current_gw()
 
-        url = self.api["live"].format(gameweek)
-        fixtures = self.session.get(url).json()["fixtures"]
+        active_team = await self.get_active_team(team_id, gameweek)
+        await self.get_live(gameweek)
 
-        total_bonus_points = 0  # Use a different variable for total bonus points
+        return self.sum_team_bonus(active_team, self.get_bonus_table(gameweek)["provisional"])
 
-        for fixture in fixtures:
-            if (fixture["finished_provisional"] != True):
-                continue
+    def sum_team_bonus(self, active_team, bonus):
+        return sum(bonus.get(element, 0) for element in active_team)
 
-            for stat in fixture["stats"]:
-                if stat["s"] == "bps":
-                    home_bps = stat["h"]
-                    away_bps = stat["a"]
-
-                    fixture_bps = home_bps + away_bps
-
-                    sorted_bps = sorted(fixture_bps, key=lambda x: x['value'], reverse=True)
-                    sorted_bps = sorted_bps[:10]
-
-                    bonus_given = [3, 2, 1, 0]
-
-                    # Handle ties by keeping track of the previous BPS value
-                    prev_bps_value = None
-                    for i, el in enumerate(sorted_bps):
-                        tie = False
-                        if prev_bps_value is not None and el['value'] == prev_bps_value:
-                            tie = True
-
-                        if (i > 2):
-                            if (tie != True):
-                                break
-                            else:
-                                i = 3
-
-                        if el["element"] in active_team:
-                            if (tie == True):
-                                # Tied position, use the same bonus as the previous player
-                                total_bonus_points += bonus_given[i - 1]
-                            else:
-                                total_bonus_points += bonus_given[i]
-                        prev_bps_value = el['value']
+    def current_live(self, gameweek):
+        # The version, payload and bonus table read together, so none of them can come from a refresh the others missed
+        live_data = self.live_cache[gameweek][1]
+        return self.versions.get(f'live:{gameweek}'), live_data, self.get_bonus_table(gameweek)
 
-        return total_bonus_points
+    def get_bonus_table(self, gameweek):
+        # Bonus only depends on the fixtures, so work it out once per live payload rather than once per team
+        fixtures = self.live_cache[gameweek][1]["fixtures"]
+        return self.memoize(f'bonus_table:{gameweek}', [f'live:{gameweek}'], lambda: self.build_bonus_table(fixtures))
 
+    def build_bonus_table(self, fixtures):
+        confirmed = {}
+        provisional = {}
+        by_fixture = {}
 
+        for fixture in fixtures:
+            stats = {stat["s"]: stat["h"] + stat["a"] for stat in fixture["stats"]}
+
+            fixture_bonus = [(el["element"], el["value"]) for el in stats.get("bonus", [])]
+            for element, value in fixture_bonus:
+                confirmed[element] = confirmed.get(element, 0) + value
+
+            # Once bonus is confirmed use it, otherwise work it out from BPS for provisionally finished fixtures
+            if not fixture_bonus and fixture["finished_provisional"] == True:
+                sorted_bps = sorted(stats.get("bps", []), key=lambda x: x['value'], reverse=True)
+
+                # Tied players share a rank and the next player drops to their position,
+                # e.g. a tie for first gives 3, 3, 1 and a tie for second gives 3, 2, 2
+                rank = 0
+                prev_bps_value = None
+                for position, el in enumerate(sorted_bps, 1):
+                    if el['value'] != prev_bps_value:
+                        rank = position
+                        prev_bps_value = el['value']
+                    if rank > 3:
+                        break
+                    fixture_bonus.append((el["element"], 4 - rank))
 
-    def get_active_team(self, team_id, gameweek=0):
-        if gameweek == 0: 
-            gameweek = self.current_gw()
+            for element, value in fixture_bonus:
+                provisional[element] = provisional.get(element, 0) + value
+            by_fixture[fixture["id"]] = fixture_bonus
 
-        url = self.api["entry"].format(team_id, gameweek)
-        picks = self.session.get(url).json()["picks"]
+        return {"confirmed": confirmed, "provisional": provisional, "fixtures": by_fixture}
 
+    async def get_active_team(self, team_id, gameweek=0):
+        picks = await self.get_picks(team_id, gameweek)
         elements = [item["element"] for item in picks if item["position"] < 12]
 
         return elements
+
+    async def get_picks(self, team_id, gameweek=0):
+        if gameweek == 0: 
+            gameweek = await self.current_gw()
+
+        # Picks are locked once a gameweek has started, so keep them for the whole gameweek
+        picks = self.picks_cache.get((team_id, gameweek))
+        metrics.cache_result('picks', picks is not None)
+        if picks is None:
+            await self.ensure_data()
+            picks = await self.load_picks(team_id, gameweek)
+            if gameweek <= self.gw_info["current_event"]:
+                self.picks_cache[(team_id, gameweek)] = picks
+
+        return picks
+
+    async def load_picks(self, team_id, gameweek):
+        finished = self.gameweek_finished(gameweek)
+        if finished:
+            picks = await asyncio.to_thread(self.archive.load_picks, team_id, gameweek)
+            metrics.cache_result('archive', picks is not None)
+            if picks is not None:
+                return picks
+
+        picks = (await self.fetch('entry', team_id, gameweek))["picks"]
+        if finished:
+            await asyncio.to_thread(self.archive.save_picks, team_id, gameweek, picks)
+        return picks
+
+    async def get_live(self, gameweek):
+        await self.ensure_data()
+
+        cached = self.live_cache.get(gameweek)
+        if cached is not None:
+            fetch_time, live_data = cached
+            # Finished gameweeks never change, live ones are refetched once per poll interval
+            if self.gameweek_finished(gameweek) or datetime.now() - fetch_time < self.live_poll_interval:
+                metrics.cache_result('live', True)
+                # Most recently used last, so eviction drops the finished gameweek nobody has asked about for longest
+                self.live_cache[gameweek] = self.live_cache.pop(gameweek)
+                return live_data
+        metrics.cache_result('live', False)
+
+        if cached is None and self.gameweek_finished(gameweek):
+            live_data = await asyncio.to_thread(self.archive.load_live, gameweek)
+            metrics.cache_result('archive', live_data is not None)
+            if live_data is not None:
+                self.cache_live(gameweek, live_data)
+                return live_data
+
+        # A stale scoreboard now beats a fresh one after Discord has given up on the interaction
+        stale = cached[1] if cached is not None else None
+        return await self.revalidate(('live_refresh', gameweek), lambda: self.refresh_live(gameweek), stale)
+
+    async def refresh_live(self, gameweek):
+        live_data = await self.fetch('live', gameweek)
+        self.cache_live(gameweek, live_data)
+        if self.gameweek_finished(gameweek):
+            await asyncio.to_thread(self.archive.save_live, gameweek, live_data, gameweek == self.gw_info["current_event"])
+
+        return live_data
+
+    def cache_live(self, gameweek, live_data):
+        cached = self.live_cache.get(gameweek)
+        key = f'live:{gameweek}'
+        if cached is None or cached[1] != live_data:
+            self.store(self.versions, key, self.versions.get(key, 0) + 1)
+        self.live_cache.pop(gameweek, None)
+        self.live_cache[gameweek] = (datetime.now(), live_data)
+        self.evict_live()
+
+    def evict_live(self):
+        # Old gameweeks live in the archive, so only a few are kept in memory along with what was built from them
+        current = self.gw_info.get("current_event")
+        finished = [gameweek for gameweek in self.live_cache if gameweek != current]
+        for gameweek in finished[:max(len(finished) - self.finished_live_cached, 0)]:
+            del self.live_cache[gameweek]
+            self.shared.derived.pop(f'bonus_table:{gameweek}', None)
+            for u in self._instances.values():
+                u.derived.pop(f'overview:{gameweek}', None)
+                u.live_scores.pop(gameweek, None)
+                for key in [key for key in u.picks_cache if key[1] == gameweek]:
+                    del u.picks_cache[key]
+
+    def last_finished_gw(self):
+        current = self.gw_info["current_event"]
+        return current if self.gw_info["current_event_finished"] == True else current - 1
+
+    def schedule_archive(self):
+        # Called after every refresh: backfills on first start and archives each gameweek as it finishes,
+        # a no-op once everything finished is on disk
+        last = self.last_finished_gw()
+        if last > self.archived_through and (self.archive_task is None or self.archive_task.done()):
+            self.archive_task = asyncio.ensure_future(self.archive_finished(last))
+        return self.archive_task
+
+    async def archive_finished(self, last):
+        start = time.perf_counter()
+        events = range(1, last + 1)
+        live_missing, picks_missing = await asyncio.to_thread(self.archive.missing, list(self.model().entries), events)
+
+        results = await asyncio.gather(
+            *[self.archive_live(gameweek) for gameweek in live_missing],
+            *[self.archive_picks(entry_id, gameweek) for entry_id, gameweek in picks_missing],
+            return_exceptions=True
+        )
+        failed = [result for result in results if isinstance(result, Exception)]
+        if failed:
+            # Whatever did make it is kept, the rest is retried after the next refresh
+            print(f'Archiving league {self.league_id} failed for {len(failed)} of {len(results)} payloads: {failed[0]}')
+            return
+
+        self.archived_through = last
+        if results:
+            print(f'Archived {len(results)} payloads for league {self.league_id} up to GW{last} in {time.perf_counter() - start:.1f}s')
+
+    async def archive_live(self, gameweek):
+        # Straight to disk, backfilling a season mustn't pull every old gameweek into memory
+        async with self.shared.archive_slots:
+            live_data = await self.fetch('live', gameweek)
+        await asyncio.to_thread(self.archive.save_live, gameweek, live_data, gameweek == self.gw_info["current_event"])
+        if gameweek in self.live_cache:
+            # The gameweek that just finished, make sure what is served is the final payload
+            self.cache_live(gameweek, live_data)
+
+    async def archive_picks(self, entry_id, gameweek):
+        picks = self.picks_cache.get((entry_id, gameweek))
+        if picks is not None:
+            await asyncio.to_thread(self.archive.save_picks, entry_id, gameweek, picks)
+            return
+        async with self.shared.archive_slots:
+            self.picks_cache[(entry_id, gameweek)] = await self.load_picks(entry_id, gameweek)
+
+    def data_age(self, *keys):
+        # Age of the oldest of the given payloads, None if they have never been loaded
+        times = [self.fetched_at.get(key) for key in keys]
+        if not times or None in times:
+            return None
+        return datetime.now() - min(times)
+
+    def live_age(self, gameweek):
+        cached = self.live_cache.get(gameweek)
+        if cached is None:
+            return None
+        return datetime.now() - cached[0]
+
+    def age_text(self, age):
+        if age is None:
+            return ""
+        minutes = int(age.total_seconds() // 60)
+        if minutes < 1:
+            return "Updated just now"
+        if minutes < 60:
+            return "Updated " + str(minutes) + " min ago"
+        if minutes < 60 * 48:
+            return "Updated " + str(minutes // 60) + "h " + str(minutes % 60) + "min ago"
+        return "Updated " + str(minutes // (60 * 24)) + " days ago"
+
+    def gameweek_finished(self, gameweek):
+        current = self.gw_info["current_event"]
+        return gameweek < current or (gameweek == current and self.gw_info["current_event_finished"] == True)
     
-    def get_overview(self, gameweek=0): 
+    async def get_overview(self, gameweek=0): 
         if gameweek == 0:
-            gameweek = self.current_gw()
-
-        live_url = self.api["live"].format(gameweek)
-        bs_url = self.api["elements"]
-        bs_data = self.session.get(bs_url).json()
+            gameweek = await self.current_gw()
 
-        fixtures = self.session.get(live_url).json()["fixtures"]
-        element_status = self.session.get(self.api["element_status"]).json()["element_status"]
-        owners = self.session.get(self.api["details"]).json()["league_entries"]
-        teams = bs_data["teams"]
-        players = bs_data["elements"]
+        live_data = await self.get_live(gameweek)
+        model = self.model()
+        bonus_table = self.get_bonus_table(gameweek)
 
-        # mapping
-        team_id_to_name = {team["id"]: team["name"] for team in teams}
-        player_id_to_name = {player["id"]: player["web_name"] for player in players}
-        player_id_to_owner = {element["element"]: element["owner"] for element in element_status}
-        owner_id_to_name = {owner["entry_id"]: owner['player_first_name'] for owner in owners}
+        # Rebuilt when the live payload or names change, and at midnight so the "today" view moves on
+        today = datetime.now(timezone.utc).date()
+        return self.memoize(f'overview:{gameweek}', [f'live:{gameweek}', 'elements', 'details', 'element_status'],
+                            lambda: Overview(gameweek, live_data, model, bonus_table, today), extra=(today,))
 
-        merged_fixtures = []
-        for fixture in fixtures:
-            merged_fixture = fixture.copy()
-            merged_fixture["team_a"] = team_id_to_name.get(fixture["team_a"], "Unknown team ID: " + str(fixture["team_a"]))
-            merged_fixture["team_h"] = team_id_to_name.get(fixture["team_h"], "Unknown team ID: " + str(fixture["team_h"]))
-            for stat in merged_fixture["stats"]:
-                for team_stat in stat["h"]:
-                    player_id = team_stat["element"]
-                    team_stat["name"] = player_id_to_name.get(team_stat["element"], "Unknown player ID: " + str(team_stat["element"]))
-                    owner_id = player_id_to_owner.get(player_id)
-                    team_stat["owner"] = owner_id
-                    team_stat["owner_name"] = owner_id_to_name.get(owner_id)
-
-                for team_stat in stat["a"]:
-                    player_id = team_stat["element"]
-                    team_stat["name"] = player_id_to_name.get(team_stat["element"], "Unknown player ID: " + str(team_stat["element"]))
-                    owner_id = player_id_to_owner.get(player_id)
-                    team_stat["owner"] = owner_id
-                    team_stat["owner_name"] = owner_id_to_name.get(owner_id)
-
-            merged_fixtures.append(merged_fixture)
-
-        return merged_fixtures
-
-    def current_gw(self, next_if_finished=False):
-        self.update_data()
+    async def current_gw(self, next_if_finished=False):
+        await self.ensure_data()
 
         if next_if_finished == True:
             if self.gw_info['current_event_finished'] == True:
@@ -545,14 +1145,15 @@ class Utils:
 
         return self.gw_info["current_event"]
 
-    def get_entries(self):
-        self.get_data('details')
+    async def get_entries(self):
+        await self.get_data('details')
+
+    async def get_league_name(self):
+        await self.ensure_data()
+        return self.data['details']['league']['name']
 
-    def get_gw_info(self):
-        return self.session.get(self.api['game']).json()
+    async def get_gw_info(self):
+        return await self.fetch('game')
 
     def remove_accents(self, string: str):
         return unidecode.unidecode(string)
-    
-utils = Utils()
-utils.get_scores()
\ No newline at end of file
@@ -0,0 +1,37 @@
+class LiveScores:
+
+    def __init__(self, gameweek, picks):
+        # picks: entry_id -> starting XI, fixed for the whole gameweek
+        self.gameweek = gameweek
+        self.picks = picks
+        self.entries_by_element = {}
+        for entry_id, elements in picks.items():
+            for element in elements:
+                self.entries_by_element.setdefault(element, []).append(entry_id)
+
+        self.points = {}
+        self.totals = {entry_id: 0 for entry_id in picks}
+        self.version = None
+
+    def update(self, version, live_data, provisional_bonus):
+        # Apply only the elements whose points moved since the last poll, returns the entries that changed
+        if version == self.version:
+            return set()
+        self.version = version
+
+        changed = set()
+        for element, entries in self.entries_by_element.items():
+            live = live_data["elements"].get(str(element))
+            if live is None:
+                continue
+            stats = live["stats"]
+            points = stats["total_points"] - stats["bonus"] + provisional_bonus.get(element, 0)
+
+            delta = points - self.points.get(element, 0)
+            if delta:
+                self.points[element] = points
+                for entry_id in entries:
+                    self.totals[entry_id] += delta
+                changed.update(entries)
+
+        return changed
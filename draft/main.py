@@ -8,13 +8,15 @@ sys.stderr = sys.stdout
 dotenv_path = 'config.env'
 load_dotenv(dotenv_path=dotenv_path)
 
-if os.getenv('DEBUG_GUILDS') is not None:
-    client = discord.Bot(debug_guilds=[os.getenv('DEBUG_GUILDS')])
-else:
-    client = discord.Bot()
+# Guarded so render worker processes can import this module without starting the bot
+if __name__ == "__main__":
+    if os.getenv('DEBUG_GUILDS') is not None:
+        client = discord.Bot(debug_guilds=[os.getenv('DEBUG_GUILDS')])
+    else:
+        client = discord.Bot()
 
-for f in os.listdir("./draft/cogs"):
-    if f.endswith(".py"):
-        client.load_extension("cogs." + f[:-3])
+    for f in os.listdir("./draft/cogs"):
+        if f.endswith(".py"):
+            client.load_extension("cogs." + f[:-3])
 
-client.run(os.getenv('TOKEN'))
\ No newline at end of file
+    client.run(os.getenv('TOKEN'))
\ No newline at end of file
@@ -0,0 +1,95 @@
+from model import LeagueEntry
+
+class Fixture:
+    __slots__ = ('event', 'finished', 'started', 'entry_id_home', 'entry_id_away',
+                 'home_player', 'away_player', 'home_score', 'away_score')
+
+    def __init__(self, match, home, away):
+        self.event = match['event']
+        self.finished = match['finished']
+        self.started = match['started']
+        self.entry_id_home = home.entry_id
+        self.entry_id_away = away.entry_id
+        self.home_player = home.player_first_name
+        self.away_player = away.player_first_name
+        self.home_score = match['league_entry_1_points']
+        self.away_score = match['league_entry_2_points']
+
+
+class HeadToHead:
+    __slots__ = ('entry', 'opponent', 'wins', 'draws', 'losses', 'points_for', 'points_against', 'matches')
+
+    def __init__(self, entry, opponent):
+        self.entry = entry
+        self.opponent = opponent
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.points_for = 0
+        self.points_against = 0
+        self.matches = []
+
+    def add(self, fixture):
+        if fixture.entry_id_home == self.entry:
+            scored, conceded = fixture.home_score, fixture.away_score
+        else:
+            scored, conceded = fixture.away_score, fixture.home_score
+
+        self.points_for += scored
+        self.points_against += conceded
+        if scored > conceded:
+            self.wins += 1
+        elif scored == conceded:
+            self.draws += 1
+        else:
+            self.losses += 1
+        self.matches.append(fixture)
+
+    def reversed(self):
+        record = HeadToHead(self.opponent, self.entry)
+        record.wins, record.draws, record.losses = self.losses, self.draws, self.wins
+        record.points_for, record.points_against = self.points_against, self.points_for
+        record.matches = self.matches
+        return record
+
+
+class MatchIndex:
+
+    def __init__(self, details):
+        entries = {entry['id']: LeagueEntry(entry) for entry in details['league_entries']}
+
+        self.fixtures = []
+        self.by_event = {}
+        # Keyed by the unordered pair of entry ids, aggregates are from the lower id's point of view
+        self.head_to_head = {}
+        for match in details['matches']:
+            home = entries.get(match['league_entry_1'])
+            away = entries.get(match['league_entry_2'])
+            if home is None or away is None:
+                continue
+
+            fixture = Fixture(match, home, away)
+            self.fixtures.append(fixture)
+            self.by_event.setdefault(fixture.event, []).append(fixture)
+
+            if fixture.finished:
+                pair = self.pair(fixture.entry_id_home, fixture.entry_id_away)
+                record = self.head_to_head.get(pair)
+                if record is None:
+                    record = self.head_to_head[pair] = HeadToHead(min(pair), max(pair))
+                record.add(fixture)
+
+    def pair(self, entry_1, entry_2):
+        return frozenset((entry_1, entry_2))
+
+    def for_event(self, event):
+        return self.by_event.get(event, [])
+
+    def between(self, entry, opponent):
+        # Finished results between two entries, oriented so entry is the one asked about first
+        record = self.head_to_head.get(self.pair(entry, opponent))
+        if record is None:
+            return HeadToHead(entry, opponent)
+        if record.entry != entry:
+            return record.reversed()
+        return record
@@ -0,0 +1,195 @@
+import os
+import math
+import time
+import asyncio
+from aiohttp import web
+
+# Minimal Prometheus text-format metrics, served from the port the Dockerfile already exposes.
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        registry.append(self)
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        values = tuple(str(value) for value in values)
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self.child()
+        return child
+
+    def format_labels(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join('{0}="{1}"'.format(name, escape(value)) for name, value in pairs) + '}'
+
+    def render(self):
+        lines = ['# HELP {0} {1}'.format(self.name, self.documentation), '# TYPE {0} {1}'.format(self.name, self.kind)]
+        for values, child in sorted(self.children.items()):
+            lines.extend(self.render_child(values, child))
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    class Child:
+        __slots__ = ('value',)
+
+        def __init__(self):
+            self.value = 0.0
+
+        def inc(self, amount=1):
+            self.value += amount
+
+    child = Child
+
+    def render_child(self, values, child):
+        return ['{0}{1} {2}'.format(self.name, self.format_labels(values), format_value(child.value))]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    class Child:
+        __slots__ = ('value',)
+
+        def __init__(self):
+            self.value = 0.0
+
+        def set(self, value):
+            self.value = value
+
+    child = Child
+
+    def render_child(self, values, child):
+        return ['{0}{1} {2}'.format(self.name, self.format_labels(values), format_value(child.value))]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)):
+        self.buckets = tuple(buckets) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+
+    def child(self):
+        return Histogram.Child(self.buckets)
+
+    class Child:
+        __slots__ = ('buckets', 'counts', 'sum')
+
+        def __init__(self, buckets):
+            self.buckets = buckets
+            self.counts = [0] * len(buckets)
+            self.sum = 0.0
+
+        def observe(self, value):
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+        def time(self):
+            return Timer(self)
+
+    def render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(child.buckets, child.counts):
+            cumulative += count
+            lines.append('{0}_bucket{1} {2}'.format(self.name, self.format_labels(values, [('le', format_value(bound))]), cumulative))
+        lines.append('{0}_sum{1} {2}'.format(self.name, self.format_labels(values), format_value(child.sum)))
+        lines.append('{0}_count{1} {2}'.format(self.name, self.format_labels(values), cumulative))
+        return lines
+
+
+class Timer:
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+registry = []
+
+command_seconds = Histogram('fpl_command_duration_seconds', 'Slash command latency', ['command', 'status'])
+upstream_requests = Counter('fpl_upstream_requests_total', 'Requests to the FPL API', ['endpoint', 'status'])
+upstream_bytes = Counter('fpl_upstream_response_bytes_total', 'Bytes received from the FPL API', ['endpoint'])
+upstream_seconds = Histogram('fpl_upstream_request_duration_seconds', 'FPL API request latency', ['endpoint'])
+upstream_retries = Counter('fpl_upstream_retries_total', 'FPL API requests retried after a timeout or server error', ['endpoint'])
+circuit_open = Gauge('fpl_upstream_circuit_open', 'Whether the circuit breaker for an endpoint is open (1) or closed (0)', ['endpoint'])
+stale_responses = Counter('fpl_stale_responses_total', 'Commands answered from cached data because a refresh missed the latency budget or failed', ['data'])
+cache_requests = Counter('fpl_cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'])
+render_seconds = Histogram('fpl_render_duration_seconds', 'Time spent drawing a team image in a render worker')
+render_wait_seconds = Histogram('fpl_render_wait_seconds', 'Time from queuing a render to receiving the image, including queueing')
+loop_lag_seconds = Histogram('fpl_event_loop_lag_seconds', 'How late the event loop woke a sleeping task',
+                             buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5))
+loop_lag_max_seconds = Gauge('fpl_event_loop_lag_max_seconds', 'Worst event loop lag seen in the last sampling window')
+
+
+def cache_result(cache, hit):
+    cache_requests.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+async def handle_metrics(request):
+    return web.Response(body=render().encode('utf-8'), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+async def start_server(host='0.0.0.0', port=int(os.getenv('METRICS_PORT', 8080))):
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def monitor_loop_lag(interval=0.5, window=60):
+    # Sleep for a fixed interval and record how much later than asked the loop woke us
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    window_start = loop.time()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        loop_lag_seconds.labels().observe(lag)
+
+        worst = max(worst, lag)
+        if loop.time() - window_start >= window:
+            loop_lag_max_seconds.labels().set(worst)
+            worst = 0.0
+            window_start = loop.time()
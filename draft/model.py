@@ -0,0 +1,94 @@
+import unidecode
+
+class Team:
+    __slots__ = ('id', 'name', 'short_name', 'code')
+
+    def __init__(self, team):
+        self.id = team['id']
+        self.name = team['name']
+        self.short_name = team['short_name']
+        self.code = team['code']
+
+
+class LeagueEntry:
+    __slots__ = ('id', 'entry_id', 'entry_name', 'player_first_name', 'short_name')
+
+    def __init__(self, entry):
+        self.id = entry['id']
+        self.entry_id = entry['entry_id']
+        self.entry_name = entry['entry_name']
+        self.player_first_name = entry['player_first_name']
+        self.short_name = entry['short_name']
+
+
+class Player:
+    __slots__ = ('id', 'web_name', 'first_name', 'second_name', 'element_type', 'position',
+                 'team', 'team_name', 'team_short_name', 'team_code', 'owner', 'owner_name', 'stats')
+
+    def __init__(self, element, position, team, owner):
+        self.id = element['id']
+        # Accents stripped for display, the raw payload is kept in stats
+        self.web_name = unidecode.unidecode(element['web_name'])
+        self.first_name = element['first_name']
+        self.second_name = element['second_name']
+        self.element_type = element['element_type']
+        self.position = position
+        self.team = element['team']
+        self.team_name = team.name if team is not None else None
+        self.team_short_name = team.short_name if team is not None else None
+        self.team_code = team.code if team is not None else None
+        self.owner = owner.entry_id if owner is not None else None
+        self.owner_name = owner.player_first_name if owner is not None else None
+        self.stats = element
+
+
+class Match:
+    __slots__ = ('event', 'finished', 'started', 'league_entry_1', 'league_entry_1_points',
+                 'league_entry_2', 'league_entry_2_points')
+
+    def __init__(self, match):
+        self.event = match['event']
+        self.finished = match['finished']
+        self.started = match['started']
+        self.league_entry_1 = match['league_entry_1']
+        self.league_entry_1_points = match['league_entry_1_points']
+        self.league_entry_2 = match['league_entry_2']
+        self.league_entry_2_points = match['league_entry_2_points']
+
+
+class DataModel:
+
+    def __init__(self, elements, details, element_status):
+        positions = {element_type['id']: element_type['plural_name'] for element_type in elements['element_types']}
+        self.teams = {team['id']: Team(team) for team in elements['teams']}
+
+        self.entries = {}
+        self.league_entries = {}
+        for entry in details['league_entries']:
+            league_entry = LeagueEntry(entry)
+            self.entries[league_entry.entry_id] = league_entry
+            self.league_entries[league_entry.id] = league_entry
+
+        owners = {status['element']: status['owner'] for status in element_status['element_status']}
+
+        self.players = {}
+        self.squads = {entry_id: [] for entry_id in self.entries}
+        for element in elements['elements']:
+            owner = self.entries.get(owners.get(element['id']))
+            player = Player(element, positions.get(element['element_type']), self.teams.get(element['team']), owner)
+            self.players[player.id] = player
+            if owner is not None:
+                self.squads[owner.entry_id].append(player)
+
+        for squad in self.squads.values():
+            squad.sort(key=lambda player: player.element_type)
+
+        self.matches = [Match(match) for match in details['matches']]
+
+    def player_name(self, player_id):
+        player = self.players.get(player_id)
+        return player.web_name if player is not None else None
+
+    def owner_name(self, player_id):
+        player = self.players.get(player_id)
+        return player.owner_name if player is not None else None
@@ -0,0 +1,63 @@
+import bisect
+import difflib
+import unidecode
+
+
+def normalize(name: str):
+    return unidecode.unidecode(name).casefold().strip()
+
+
+class NameIndex:
+
+    def __init__(self, names):
+        # names is an iterable of (display name, key) pairs
+        self.keys = {}
+        self.display = {}
+        for name, key in names:
+            if not isinstance(name, str):
+                continue
+            norm = normalize(name)
+            self.keys.setdefault(norm, []).append(key)
+            self.display.setdefault(norm, name)
+
+        self.sorted_names = sorted(self.keys)
+
+    def get(self, name: str):
+        return self.keys.get(normalize(name), [])
+
+    def lookup(self, name: str, cutoff=0.8):
+        # Exact match first, then the single closest name to forgive typos
+        keys = self.get(name)
+        if keys:
+            return keys
+
+        close = difflib.get_close_matches(normalize(name), self.sorted_names, n=1, cutoff=cutoff)
+        if close:
+            return self.keys[close[0]]
+        return []
+
+    def prefix(self, text: str, limit=25):
+        norm = normalize(text)
+        start = bisect.bisect_left(self.sorted_names, norm)
+
+        matches = []
+        for name in self.sorted_names[start:]:
+            if not name.startswith(norm) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+    def search(self, text: str, limit=25):
+        # Prefix matches, then names containing the text, then fuzzy matches
+        norm = normalize(text)
+        if not norm:
+            return [self.display[name] for name in self.sorted_names[:limit]]
+
+        matches = self.prefix(norm, limit)
+        if len(matches) < limit:
+            matches += [name for name in self.sorted_names if norm in name and name not in matches][:limit - len(matches)]
+        if len(matches) < limit:
+            close = difflib.get_close_matches(norm, self.sorted_names, n=limit, cutoff=0.6)
+            matches += [name for name in close if name not in matches][:limit - len(matches)]
+
+        return [self.display[name] for name in matches]
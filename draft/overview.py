@@ -0,0 +1,62 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# Built once per live payload version and shared by every /overview, so everything here is immutable
+StatEntry = namedtuple('StatEntry', ['stat', 'element', 'value', 'name', 'owner', 'owner_name'])
+BonusEntry = namedtuple('BonusEntry', ['element', 'value', 'name', 'owner', 'owner_name'])
+FixtureOverview = namedtuple('FixtureOverview', ['id', 'kickoff_time', 'started', 'finished', 'team_h', 'team_a',
+                                                 'team_h_score', 'team_a_score', 'stats', 'provisional_bonus'])
+
+
+class Overview:
+
+    views = ('today', 'gameweek', 'live')
+
+    def __init__(self, gameweek, live_data, model, bonus_table, today=None):
+        if today is None:
+            today = datetime.now(timezone.utc).date()
+        self.gameweek = gameweek
+
+        def team_name(team_id):
+            team = model.teams.get(team_id)
+            return team.name if team is not None else "Unknown team ID: " + str(team_id)
+
+        def player(player_id):
+            player = model.players.get(player_id)
+            if player is None:
+                return "Unknown player ID: " + str(player_id), None, None
+            return player.stats["web_name"], player.owner, player.owner_name
+
+        fixtures = []
+        for fixture in live_data["fixtures"]:
+            stats = []
+            for stat in fixture["stats"]:
+                for team_stat in stat["h"] + stat["a"]:
+                    stats.append(StatEntry(stat["s"], team_stat["element"], team_stat["value"], *player(team_stat["element"])))
+
+            provisional_bonus = tuple(
+                BonusEntry(player_id, value, *player(player_id))
+                for player_id, value in bonus_table["fixtures"].get(fixture["id"], [])
+            )
+
+            kickoff_time = None
+            if fixture["kickoff_time"] is not None:
+                kickoff_time = datetime.strptime(fixture["kickoff_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+            fixtures.append(FixtureOverview(
+                fixture["id"], kickoff_time, fixture["started"], fixture["finished"],
+                team_name(fixture["team_h"]), team_name(fixture["team_a"]),
+                fixture["team_h_score"], fixture["team_a_score"], tuple(stats), provisional_bonus
+            ))
+
+        # Only fixtures that have kicked off are shown in any view
+        started = [fixture for fixture in fixtures if fixture.started]
+        self.fixtures = tuple(fixtures)
+        self.by_view = {
+            'today': tuple(fixture for fixture in started if fixture.kickoff_time is not None and fixture.kickoff_time.date() == today),
+            'gameweek': tuple(started),
+            'live': tuple(fixture for fixture in started if not fixture.finished),
+        }
+
+    def view(self, name):
+        return self.by_view[name]
@@ -0,0 +1,27 @@
+import os
+import hashlib
+import json
+from collections import OrderedDict
+
+class RenderCache:
+
+    def __init__(self, max_entries=int(os.getenv('RENDER_CACHE_SIZE', 64))):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def key(self, *parts):
+        # Content-addressed, so a changed squad simply hashes to a new key and the old image ages out
+        encoded = json.dumps(parts, separators=(",", ":"), default=str).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()
+
+    def get(self, key):
+        content = self.entries.get(key)
+        if content is not None:
+            self.entries.move_to_end(key)
+        return content
+
+    def put(self, key, content):
+        self.entries[key] = content
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
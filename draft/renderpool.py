@@ -0,0 +1,78 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from rendercache import RenderCache
+from teamImg import TeamImg
+import metrics
+
+renderer = None
+
+def render_squad(squad):
+    # Runs inside a worker process, which keeps its own TeamImg and shirt cache between jobs
+    global renderer
+    if renderer is None:
+        renderer = TeamImg()
+    # Timed here because metrics recorded in the worker never reach the bot's /metrics
+    start = time.perf_counter()
+    image = renderer.render_squad_png(squad)
+    return image, time.perf_counter() - start
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderPool:
+
+    def __init__(self, workers=int(os.getenv('RENDER_WORKERS', 2)), max_queue=int(os.getenv('RENDER_QUEUE_DEPTH', 16))):
+        # Spawned rather than forked, the bot process has threads running by the time we render
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.max_queue = max_queue
+        self.pending = 0
+        self.cache = RenderCache()
+
+    def key(self, squad):
+        return self.cache.key(TeamImg.render_version, os.getenv('IMG_FONT'), squad)
+
+    async def render(self, squad):
+        return (await self.render_many([squad]))[0]
+
+    async def render_many(self, squads):
+        keys = [self.key(squad) for squad in squads]
+        images = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, image in enumerate(images) if image is None]
+        for image in images:
+            metrics.cache_result('render', image is not None)
+        # Queued a chunk at a time, so a league bigger than the queue still renders when nothing else is waiting
+        for chunk_start in range(0, len(missing), self.max_queue):
+            chunk = missing[chunk_start:chunk_start + self.max_queue]
+            for i, image in zip(chunk, await self.render_chunk([squads[i] for i in chunk])):
+                self.cache.put(keys[i], image)
+                images[i] = image
+
+        return images
+
+    async def render_chunk(self, squads):
+        if self.pending + len(squads) > self.max_queue:
+            raise RenderQueueFull(f'{self.pending} renders already queued')
+
+        self.pending += len(squads)
+        try:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            rendered = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, render_squad, squad) for squad in squads
+            ])
+        finally:
+            self.pending -= len(squads)
+
+        metrics.render_wait_seconds.labels().observe(time.perf_counter() - start)
+        for image, seconds in rendered:
+            metrics.render_seconds.labels().observe(seconds)
+        return [image for image, seconds in rendered]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
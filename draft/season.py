@@ -0,0 +1,78 @@
+import numpy as np
+
+class SeasonMatrix:
+
+    def __init__(self, entry_ids, gameweeks):
+        # One row per league entry, one column per gameweek (column 0 is GW1)
+        self.entry_ids = list(entry_ids)
+        self.rows = {entry_id: row for row, entry_id in enumerate(self.entry_ids)}
+        self.gameweeks = gameweeks
+
+        shape = (len(self.entry_ids), gameweeks)
+        self.points = np.zeros(shape, dtype=np.int32)
+        self.bench = np.zeros(shape, dtype=np.int32)
+        self.bonus = np.zeros(shape, dtype=np.int32)
+        self.filled = np.zeros(gameweeks, dtype=bool)
+        # Filled columns whose gameweek has finished, the live one is filled but not final
+        self.final = np.zeros(gameweeks, dtype=bool)
+        # Live payload version each column was built from, "final" once its gameweek has finished
+        self.sources = {}
+
+    def set_gameweek(self, gameweek, source, live_data, picks, provisional_bonus):
+        # picks: entry_id -> element ids ordered by pick position, the first 11 start and the rest are the bench
+        if self.sources.get(gameweek) == source:
+            return False
+
+        size = max((int(element) for element in live_data["elements"]), default=0) + 1
+        scored = np.zeros(size + 1, dtype=np.int32)
+        bonus = np.zeros(size + 1, dtype=np.int32)
+        for element, live in live_data["elements"].items():
+            stats = live["stats"]
+            scored[int(element)] = stats["total_points"] - stats["bonus"]
+        for element, value in provisional_bonus.items():
+            if element < size:
+                bonus[element] = value
+
+        # Padded to 15 picks with an index that always scores zero, so the whole league is one lookup
+        squads = np.full((len(self.entry_ids), 15), size, dtype=np.int64)
+        for entry_id, elements in picks.items():
+            row = self.rows.get(entry_id)
+            if row is not None:
+                elements = [element if element < size else size for element in elements[:15]]
+                squads[row, :len(elements)] = elements
+
+        points = scored[squads] + bonus[squads]
+        column = gameweek - 1
+        self.points[:, column] = points[:, :11].sum(axis=1)
+        self.bench[:, column] = points[:, 11:].sum(axis=1)
+        self.bonus[:, column] = bonus[squads[:, :11]].sum(axis=1)
+        self.filled[column] = True
+        self.final[column] = source == 'final'
+        self.sources[gameweek] = source
+        return True
+
+    def columns(self, last=None, final=False):
+        # Indices of the filled gameweeks (or only finished ones), only the most recent ones if last is given
+        columns = np.flatnonzero(self.final if final else self.filled)
+        if last is not None:
+            columns = columns[-last:]
+        return columns
+
+    def totals(self, last=None):
+        columns = self.columns(last)
+        return (self.points[:, columns].sum(axis=1), self.bench[:, columns].sum(axis=1),
+                self.bonus[:, columns].sum(axis=1), columns)
+
+    def extremes(self):
+        # Best and worst finished gameweek of every entry as (gameweek, points) arrays,
+        # a week still being played would nearly always be everyone's worst
+        columns = self.columns(final=True)
+        points = self.points[:, columns]
+        best = points.argmax(axis=1)
+        worst = points.argmin(axis=1)
+        rows = np.arange(len(self.entry_ids))
+        return (columns[best] + 1, points[rows, best]), (columns[worst] + 1, points[rows, worst])
+
+    def cumulative(self):
+        columns = self.columns()
+        return columns + 1, self.points[:, columns].cumsum(axis=1)
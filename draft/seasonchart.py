@@ -0,0 +1,66 @@
+import os
+from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+
+class SeasonChart:
+
+    size = (900, 500)
+    margin = (50, 20, 190, 40)  # left, top, right, bottom
+    background = (55, 0, 60)
+    grid = (110, 70, 115)
+    colours = [(0, 255, 135), (4, 245, 255), (233, 0, 82), (255, 206, 0), (255, 255, 255), (255, 130, 40),
+               (150, 120, 255), (120, 200, 60), (255, 110, 200), (60, 140, 255), (200, 200, 140), (170, 60, 60)]
+
+    def font(self, size):
+        fontname = os.getenv('IMG_FONT')
+        if fontname is None:
+            return ImageFont.load_default()
+        return ImageFont.truetype(fontname, size)
+
+    def render_png(self, names, gameweeks, cumulative):
+        with BytesIO() as image_binary:
+            self.create_chart(names, gameweeks, cumulative).save(image_binary, 'PNG')
+            return image_binary.getvalue()
+
+    def create_chart(self, names, gameweeks, cumulative):
+        # cumulative: one row of running totals per name, one column per gameweek
+        width, height = self.size
+        left, top, right, bottom = self.margin
+        plot_w, plot_h = width - left - right, height - top - bottom
+        image = Image.new('RGB', self.size, self.background)
+        draw = ImageDraw.Draw(image)
+        font = self.font(12)
+
+        highest = max(int(cumulative.max()), 1) if cumulative.size else 1
+        step = max(len(gameweeks) - 1, 1)
+
+        def point(column, value):
+            return left + plot_w * column / step, top + plot_h * (1 - value / highest)
+
+        for i in range(5):
+            value = highest * i / 4
+            y = point(0, value)[1]
+            draw.line([(left, y), (left + plot_w, y)], fill=self.grid)
+            draw.text((4, y - 7), str(int(value)), fill="White", font=font)
+        for column, gameweek in enumerate(gameweeks):
+            x = point(column, 0)[0]
+            draw.text((x - 6, top + plot_h + 8), str(gameweek), fill="White", font=font)
+
+        # Drawn lowest total first so the leader ends up on top
+        order = sorted(range(len(names)), key=lambda row: cumulative[row, -1] if cumulative.size else 0)
+        for index, row in enumerate(order):
+            rank = len(order) - 1 - index
+            colour = self.colours[row % len(self.colours)]
+            points = [point(column, value) for column, value in enumerate(cumulative[row])]
+            if len(points) > 1:
+                draw.line(points, fill=colour, width=3)
+            elif points:
+                x, y = points[0]
+                draw.ellipse([(x - 3, y - 3), (x + 3, y + 3)], fill=colour)
+
+            legend_y = top + rank * 20
+            draw.rectangle([(width - right + 15, legend_y + 3), (width - right + 27, legend_y + 15)], fill=colour)
+            total = int(cumulative[row, -1]) if cumulative.size else 0
+            draw.text((width - right + 35, legend_y + 2), names[row] + " " + str(total), fill="White", font=font)
+
+        return image
@@ -0,0 +1,111 @@
+import os
+import asyncio
+import tempfile
+import aiohttp
+import requests
+from io import BytesIO
+from PIL import Image
+import metrics
+
+class ShirtCache:
+
+    url = os.getenv('FPL_API_BASE', 'https://draft.premierleague.com').rstrip('/') + "/img/shirts/standard/shirt_{0}-66.png"
+    timeout = aiohttp.ClientTimeout(total=10, connect=3)
+    cache_dir = os.path.join(os.getenv('CACHE_DIR', os.path.join(os.path.dirname(__file__), "cache")), "shirts")
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # Decoded RGBA images in memory, raw PNG bytes on disk
+            self.images = {}
+            self.inflight = {}
+            self.session = None
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._initialized = True
+
+    def path(self, shirt):
+        return os.path.join(self.cache_dir, "shirt_{0}-66.png".format(shirt))
+
+    def get(self, shirt):
+        image = self.images.get(shirt)
+        metrics.cache_result('shirts', image is not None)
+        if image is not None:
+            return image
+
+        content = self.read(shirt)
+        metrics.cache_result('shirts_disk', content is not None)
+        if content is None:
+            # Only reached if the prefetch hasn't covered this shirt yet
+            if self.session is None:
+                self.session = requests.session()
+            r = self.session.get(self.url.format(shirt), timeout=(3, 10))
+            r.raise_for_status()
+            content = r.content
+            self.write(shirt, content)
+
+        return self.decode(shirt, content)
+
+    async def prefetch(self, session, shirts, concurrency=8):
+        # Renders happen in worker processes, so the bot only fills the disk tier they read from
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(shirt):
+            async with semaphore:
+                async with session.get(self.url.format(shirt), timeout=self.timeout) as r:
+                    content = await r.read()
+            await asyncio.to_thread(self.write, shirt, content)
+
+        def shared_fetch(shirt):
+            # Overlapping prefetches wait on the same download instead of starting another
+            task = self.inflight.get(shirt)
+            if task is None:
+                task = self.inflight[shirt] = asyncio.ensure_future(fetch(shirt))
+                task.add_done_callback(lambda done: self.inflight.pop(shirt, None))
+            return asyncio.shield(task)
+
+        on_disk = await asyncio.to_thread(lambda: [os.path.exists(self.path(shirt)) for shirt in shirts])
+        for cached in on_disk:
+            metrics.cache_result('shirts_disk', cached)
+        missing = [shirt for shirt, cached in zip(shirts, on_disk) if not cached]
+        results = await asyncio.gather(*[shared_fetch(shirt) for shirt in missing], return_exceptions=True)
+        for shirt, result in zip(missing, results):
+            if isinstance(result, Exception):
+                print('Failed to prefetch shirt ' + str(shirt) + ': ' + str(result))
+
+    def shirts_for_teams(self, teams):
+        # Goalkeepers wear the _1 variant of their team's shirt
+        shirts = []
+        for team in teams:
+            shirts.append(str(team["code"]))
+            shirts.append(str(team["code"]) + "_1")
+        return shirts
+
+    def read(self, shirt):
+        try:
+            with open(self.path(shirt), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, shirt, content):
+        # Write then rename so a concurrent reader never sees a partial file. The temp name is unique because
+        # the bot's prefetch and a render worker can both be writing the same shirt
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix="shirt_", suffix=".tmp", delete=False) as f:
+            f.write(content)
+        try:
+            os.replace(f.name, self.path(shirt))
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def decode(self, shirt, content):
+        image = Image.open(BytesIO(content)).convert("RGBA")
+        self.images[shirt] = image
+        return image
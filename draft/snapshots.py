@@ -0,0 +1,53 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+class SnapshotStore:
+
+    path = os.getenv('SNAPSHOT_DB', os.path.join(os.getenv('CACHE_DIR', os.path.join(os.path.dirname(__file__), "cache")), "snapshots.db"))
+
+    def __init__(self, path=None):
+        if path is not None:
+            self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # Saves run in worker threads so the event loop never waits on compression or disk,
+        # the lock keeps concurrent saves from interleaving their transactions on the shared connection
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS payloads (key TEXT PRIMARY KEY, fetched_at REAL, body BLOB)")
+        self.db.commit()
+
+    def save(self, key, payload, fetched_at=None):
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self.lock, self.db:
+            self.db.execute("REPLACE INTO payloads (key, fetched_at, body) VALUES (?, ?, ?)", (key, fetched_at, body))
+
+    def touch(self, key, fetched_at=None):
+        # Payload unchanged, just record that it is still current
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        with self.lock, self.db:
+            self.db.execute("UPDATE payloads SET fetched_at = ? WHERE key = ?", (fetched_at, key))
+
+    def load(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT fetched_at, body FROM payloads WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def load_all(self, keys):
+        snapshots = {}
+        for key in keys:
+            snapshot = self.load(key)
+            if snapshot is not None:
+                snapshots[key] = snapshot
+        return snapshots
@@ -1,13 +1,15 @@
 import os
-from PIL import Image, ImageDraw, ImageFont, ImageColor
-import requests
 from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont, ImageColor
+from shirtcache import ShirtCache
 
 class TeamImg:
 
+    # Bump whenever the output changes so cached renders aren't reused
+    render_version = 1
+
     image_urls = {
-        'pitch': os.path.join(os.path.dirname(__file__), "img/pitch.png"),
-        'shirt': "https://draft.premierleague.com/img/shirts/standard/shirt_{0}-66.png"
+        'pitch': os.path.join(os.path.dirname(__file__), "img/pitch.png")
     }
 
     team_shirt_numbers = {
@@ -34,51 +36,63 @@ class TeamImg:
     }
 
     def __init__(self):
-        self.session = requests.session()
+        self.shirts = ShirtCache()
 
         self.background = Image.open(self.image_urls["pitch"]).convert("RGBA")
 
     def main(self, team_df):
-        background = self.create_team_image(self.background, team_df)
-        return background
-
-    def create_team_image(self, background, team_df):
-        goalkeepers_df = team_df.loc[team_df['plural_name'] == 'Goalkeepers']
-        defenders_df = team_df.loc[team_df['plural_name'] == 'Defenders']
-        midfielders_df = team_df.loc[team_df['plural_name'] == 'Midfielders']
-        forwards_df = team_df.loc[team_df['plural_name'] == 'Forwards']
+        return self.create_team_image(self.background.copy(), self.squad_from_df(team_df))
+
+    def squad_from_df(self, team_df):
+        # Compact, picklable description of a squad: (element, position, shirt number, name)
+        return [
+            (row.element, row.plural_name, self.shirt_number(row), row.web_name)
+            for row in team_df.itertuples()
+        ]
+
+    def squad_from_players(self, players):
+        return [
+            (player.id, player.position, self.shirt_number(player), player.web_name)
+            for player in players
+        ]
+
+    def render_squad_png(self, squad):
+        with BytesIO() as image_binary:
+            self.create_team_image(self.background.copy(), squad).save(image_binary, 'PNG')
+            return image_binary.getvalue()
+
+    def create_team_image(self, background, squad):
+        goalkeepers = [player for player in squad if player[1] == 'Goalkeepers']
+        defenders = [player for player in squad if player[1] == 'Defenders']
+        midfielders = [player for player in squad if player[1] == 'Midfielders']
+        forwards = [player for player in squad if player[1] == 'Forwards']
 
         row_start = background.height // 12
         row_height = background.height // 5
 
-        background = self.add_player_row(background, goalkeepers_df, row_start)
-        background = self.add_player_row(background, defenders_df, row_start + row_height)
-        background = self.add_player_row(background, midfielders_df, row_start + (row_height*2))
-        background = self.add_player_row(background, forwards_df, row_start + (row_height*3))
+        background = self.add_player_row(background, goalkeepers, row_start)
+        background = self.add_player_row(background, defenders, row_start + row_height)
+        background = self.add_player_row(background, midfielders, row_start + (row_height*2))
+        background = self.add_player_row(background, forwards, row_start + (row_height*3))
 
         return background
 
-    def add_player_row(self, background, players_df, height):
+    def add_player_row(self, background, players, height):
         shirt_width = 66
 
-        gap, margin = self.calculate_gap(shirt_width, background.width, len(players_df.index))
+        gap, margin = self.calculate_gap(shirt_width, background.width, len(players))
         player_place = margin
-        for row in players_df.itertuples():
-            if row.plural_name == "Goalkeepers":
-                team_num = self.team_shirt_numbers[row.team_name] + "_1"
-            else:
-                team_num = self.team_shirt_numbers[row.team_name]
-                
-            url = self.image_urls['shirt']
-            r = self.session.get(url.format(team_num))
-            b_image = BytesIO(r.content)
-            shirt = Image.open(b_image).convert("RGBA")
+        for element, plural_name, team_num, web_name in players:
+            if plural_name == "Goalkeepers":
+                team_num += "_1"
+
+            shirt = self.shirts.get(team_num)
             
             offset = (player_place, height)
             background.paste(shirt, offset, shirt)
 
             w, h = shirt.width + shirt.width // 3 * 2, shirt.height // 4
-            textoverlay = self.generate_player_text((w,h), os.getenv('IMG_FONT'), 12, (55,0,60), "White", row.web_name)
+            textoverlay = self.generate_player_text((w,h), os.getenv('IMG_FONT'), 12, (55,0,60), "White", web_name)
             textoffset = (player_place - (shirt.width // 4), height + shirt.height)
             background.paste(textoverlay, textoffset, textoverlay)
 
@@ -86,6 +100,13 @@ class TeamImg:
 
         return background
 
+    def shirt_number(self, row):
+        # Shirt images are numbered by the team code, fall back to the name map for older data
+        team_code = getattr(row, "team_code", None)
+        if team_code is not None and team_code == team_code:
+            return str(int(team_code))
+        return self.team_shirt_numbers[row.team_name]
+
     def generate_player_text(self, size, fontname, fontsize, bg, fg, text):
         W, H = size
         canvas = Image.new('RGBA', size, bg)
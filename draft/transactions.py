@@ -0,0 +1,57 @@
+class Transaction:
+    __slots__ = ('id', 'index', 'event', 'entry', 'kind', 'result', 'added', 'element_in', 'element_out',
+                 'element_in_name', 'element_out_name', 'short_name', 'owner_name')
+
+    def __init__(self, transaction, model):
+        self.id = transaction['id']
+        self.index = transaction['index']
+        self.event = transaction['event']
+        self.entry = transaction['entry']
+        self.kind = transaction['kind']
+        self.result = transaction['result']
+        self.added = transaction['added']
+        self.element_in = transaction['element_in']
+        self.element_out = transaction['element_out']
+
+        # Names are resolved once here so /waivers never has to join against the player table
+        self.element_in_name = model.player_name(self.element_in)
+        self.element_out_name = model.player_name(self.element_out)
+        owner = model.entries.get(self.entry)
+        self.short_name = owner.short_name if owner is not None else None
+        self.owner_name = owner.player_first_name if owner is not None else None
+
+
+class TransactionLog:
+
+    def __init__(self):
+        # Append-only by transaction id, indexed by gameweek and by entry
+        self.transactions = {}
+        self.by_event = {}
+        self.by_entry = {}
+
+    def ingest(self, payload, model):
+        added = []
+        for transaction in payload['transactions']:
+            if transaction['id'] in self.transactions:
+                continue
+            record = Transaction(transaction, model)
+            self.transactions[record.id] = record
+            self.by_event.setdefault(record.event, []).append(record)
+            self.by_entry.setdefault(record.entry, []).append(record)
+            added.append(record)
+
+        for event in {record.event for record in added}:
+            self.by_event[event].sort(key=lambda record: record.index)
+        for entry in {record.entry for record in added}:
+            self.by_entry[entry].sort(key=lambda record: (record.event, record.index))
+
+        return len(added)
+
+    def for_event(self, event):
+        return self.by_event.get(event, [])
+
+    def for_entry(self, entry):
+        return self.by_entry.get(entry, [])
+
+    def all(self):
+        return [record for event in sorted(self.by_event) for record in self.by_event[event]]